@@ -0,0 +1,84 @@
+"""Measure how long a fresh process takes to serve requests at steady state.
+
+Each run starts a new interpreter so imports are cold, then reports the
+time spent importing, building the app, warming up and serving the first
+and subsequent ``GET /products/`` requests. Requires a reachable Mongo
+configured through the usual environment variables.
+
+    poetry run python benchmarks/startup.py --runs 5 [--no-warm-up]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+from store.main import create_app
+imported = time.perf_counter()
+
+import httpx
+
+
+async def main(warm):
+    app = create_app()
+    created = time.perf_counter()
+    async with app.router.lifespan_context(app) if warm else _noop():
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://test")
+        async with client:
+            latencies = []
+            for _ in range(21):
+                before = time.perf_counter()
+                (await client.get("/products/")).raise_for_status()
+                latencies.append(time.perf_counter() - before)
+    return {
+        "import": imported - started,
+        "create_app": created - imported,
+        "warm_up": ready - created,
+        "first_request": latencies[0],
+        "steady_request": sorted(latencies[1:])[len(latencies) // 2],
+    }
+
+
+class _noop:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return None
+
+
+print(json.dumps(asyncio.run(main(sys.argv[1] == "1"))))
+"""
+
+
+def run_once(warm: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, "1" if warm else "0"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(output.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warm-up", dest="warm", action="store_false")
+    args = parser.parse_args()
+
+    runs = [run_once(args.warm) for _ in range(args.runs)]
+    print(f"{'phase':<16}{'median ms':>12}{'max ms':>12}")
+    for phase in runs[0]:
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<16}{statistics.median(values):>12.2f}{max(values):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
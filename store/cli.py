@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from contextlib import nullcontext
+from typing import (
+    IO,
+    ContextManager,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from pydantic import ValidationError
+
+from store.core.config import get_settings
+from store.core.exceptions import PriceStorageException
+from store.schemas.product import ProductIn
+from store.usecases.price_migration import PriceMigrationUsecase
+from store.usecases.product import ProductUsecase, product_events
+
+FORMATS = ("csv", "ndjson")
+EXPORT_FIELDS = [
+    "id",
+    "name",
+    "quantity",
+    "price",
+    "status",
+    "created_at",
+    "updated_at",
+]
+
+# Linhas que não puderam ser lidas chegam como o erro de leitura
+Row = Tuple[int, Union[dict, ValueError]]
+
+
+class Progress:
+    def __init__(self, stream: IO[str], interval: float = 1.0) -> None:
+        self.stream = stream
+        self.interval = interval
+        self.rows = 0
+        self.errors = 0
+        self.started_at = time.monotonic()
+        self.reported_at = self.started_at
+
+    @property
+    def throughput(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def error(self, row: int, message: str) -> None:
+        self.errors += 1
+        self.stream.write(json.dumps({"row": row, "error": message}) + "\n")
+
+    def advance(self, rows: int) -> None:
+        self.rows += rows
+        now = time.monotonic()
+        if now - self.reported_at >= self.interval:
+            self.reported_at = now
+            self.report()
+
+    def report(self) -> None:
+        print(
+            f"{self.rows} rows, {self.errors} errors, {self.throughput:.0f} rows/s",
+            file=sys.stderr,
+        )
+
+
+def detect_format(path: str, format: Optional[str]) -> str:
+    if format:
+        return format
+    if path.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def read_rows(file: IO[str], format: str) -> Iterator[Row]:
+    if format == "csv":
+        # Linha 1 é o cabeçalho
+        for number, row in enumerate(csv.DictReader(file), start=2):
+            yield number, row
+        return
+
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, exc
+
+
+def batched(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    batch: List[Row] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def import_products(
+    file: IO[str],
+    format: str,
+    progress: Progress,
+    batch_size: int = 500,
+    concurrency: int = 4,
+    upsert: bool = False,
+) -> None:
+    usecase = ProductUsecase()
+    # A fila limitada segura a leitura enquanto os writers estão ocupados,
+    # mantendo no máximo ``concurrency * 2`` lotes em memória.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    # O índice único em name rejeita nomes repetidos entre lotes concorrentes
+    await usecase.ensure_indexes()
+
+    async def writer() -> None:
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+
+            products: List[ProductIn] = []
+            numbers: List[int] = []
+            for number, row in batch:
+                if isinstance(row, ValueError):
+                    progress.error(number, f"Invalid JSON: {row}")
+                    continue
+                try:
+                    products.append(ProductIn.model_validate(row))
+                    numbers.append(number)
+                except ValidationError as exc:
+                    progress.error(number, str(exc.errors(include_url=False)))
+
+            if products:
+                errors = await usecase.bulk_create(bodies=products, upsert=upsert)
+                for position, message in errors.items():
+                    progress.error(numbers[position], message)
+
+            progress.advance(len(batch))
+
+    async def reader() -> None:
+        for batch in batched(read_rows(file, format), batch_size):
+            await queue.put(batch)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(reader())]
+    tasks += [asyncio.create_task(writer()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def export_products(
+    file: IO[str], format: str, progress: Progress, batch_size: int = 1000
+) -> None:
+    usecase = ProductUsecase()
+    writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS)
+    if format == "csv":
+        writer.writeheader()
+
+    async for product in usecase.stream(batch_size=batch_size):
+        if format == "csv":
+            writer.writerow(product.model_dump(mode="json"))
+        else:
+            file.write(product.model_dump_json() + "\n")
+        progress.advance(1)
+
+
+def open_file(path: str, mode: str) -> ContextManager[IO[str]]:
+    if path == "-":
+        return nullcontext(sys.stdin if mode == "r" else sys.stdout)
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def run_import(args: argparse.Namespace) -> int:
+    errors_file = (
+        open_file(args.errors, "w") if args.errors else nullcontext(sys.stderr)
+    )
+    with errors_file as errors:
+        progress = Progress(stream=errors)
+        with open_file(args.path, "r") as file:
+            asyncio.run(
+                import_products(
+                    file=file,
+                    format=detect_format(args.path, args.format),
+                    progress=progress,
+                    batch_size=args.batch_size,
+                    concurrency=args.concurrency,
+                    upsert=args.upsert,
+                )
+            )
+    progress.report()
+    return 1 if progress.errors else 0
+
+
+def run_export(args: argparse.Namespace) -> int:
+    progress = Progress(stream=sys.stderr)
+    with open_file(args.path, "w") as file:
+        asyncio.run(
+            export_products(
+                file=file,
+                format=detect_format(args.path, args.format),
+                progress=progress,
+                batch_size=args.batch_size,
+            )
+        )
+    progress.report()
+    return 0
+
+
+def run_migrate_prices(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    if settings.PRICE_STORAGE != "minor_units":
+        print(PriceStorageException.message, file=sys.stderr)
+        return 2
+    if not settings.PRICE_DUAL_READ:
+        print(
+            "Warning: PRICE_DUAL_READ is off, price filters skip products "
+            "that are not migrated yet",
+            file=sys.stderr,
+        )
+
+    progress = Progress(stream=sys.stderr)
+    usecase = PriceMigrationUsecase()
+
+    async def migrate() -> int:
+        if args.restart:
+            await usecase.reset()
+        return await usecase.run(
+            batch_size=args.batch_size, pause=args.pause, on_batch=progress.advance
+        )
+
+    migrated = asyncio.run(migrate())
+    progress.report()
+    print(f"{migrated} prices migrated", file=sys.stderr)
+    return 0
+
+
+class Server(uvicorn.Server):
+    """Ends open event streams as soon as shutdown starts.
+
+    uvicorn only sends the lifespan shutdown after in-flight requests have
+    drained, and SSE responses never finish on their own.
+    """
+
+    async def shutdown(self, *args, **kwargs) -> None:
+        product_events.close()
+        await super().shutdown(*args, **kwargs)
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    # Importa a aplicação por caminho: cada worker é um processo novo que
+    # cria o próprio client do Mongo no primeiro uso.
+    settings = get_settings()
+    config = uvicorn.Config(
+        "store.main:create_app",
+        factory=True,
+        host=args.host or settings.SERVER_HOST,
+        port=args.port or settings.SERVER_PORT,
+        workers=args.workers or settings.SERVER_WORKERS,
+        timeout_graceful_shutdown=(
+            args.graceful_timeout or settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT
+        ),
+    )
+    server = Server(config=config)
+    if config.workers > 1:
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Import products from a file")
+    importer.add_argument("path", help="CSV or NDJSON file, '-' for stdin")
+    importer.add_argument("--format", choices=FORMATS)
+    importer.add_argument("--batch-size", type=int, default=500)
+    importer.add_argument("--concurrency", type=int, default=4)
+    importer.add_argument(
+        "--upsert", action="store_true", help="Update products with the same name"
+    )
+    importer.add_argument("--errors", help="Write per-row errors to this file")
+    importer.set_defaults(handler=run_import)
+
+    exporter = commands.add_parser("export", help="Export products to a file")
+    exporter.add_argument("path", help="CSV or NDJSON file, '-' for stdout")
+    exporter.add_argument("--format", choices=FORMATS)
+    exporter.add_argument("--batch-size", type=int, default=1000)
+    exporter.set_defaults(handler=run_export)
+
+    migrator = commands.add_parser(
+        "migrate-prices", help="Convert stored prices to integer minor units"
+    )
+    migrator.add_argument("--batch-size", type=int, default=500)
+    migrator.add_argument(
+        "--pause", type=float, default=0.0, help="Seconds to wait between batches"
+    )
+    migrator.add_argument(
+        "--restart", action="store_true", help="Ignore the saved checkpoint"
+    )
+    migrator.set_defaults(handler=run_migrate_prices)
+
+    server = commands.add_parser("serve", help="Run the API with multiple workers")
+    server.add_argument("--host")
+    server.add_argument("--port", type=int)
+    server.add_argument("--workers", type=int)
+    server.add_argument(
+        "--graceful-timeout",
+        type=int,
+        help="Seconds to drain in-flight requests on shutdown",
+    )
+    server.set_defaults(handler=run_serve)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Request, Response, status
+
+router = APIRouter(tags=["health"])
+
+
+@router.get(path="/live", status_code=status.HTTP_200_OK)
+async def live() -> dict:
+    return {"status": "ok"}
+
+
+@router.get(path="/ready", status_code=status.HTTP_200_OK)
+async def ready(request: Request, response: Response) -> dict:
+    if not request.app.state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming up"}
+
+    return {"status": "ready"}
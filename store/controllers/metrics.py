@@ -0,0 +1,11 @@
+from fastapi import APIRouter, status
+
+from store.db.monitoring import read_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(path="/mongo", status_code=status.HTTP_200_OK)
+async def mongo() -> dict:
+    """Reads served per server type (RSPrimary, RSSecondary, Standalone...)."""
+    return {"reads": read_metrics.snapshot()}
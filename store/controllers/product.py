@@ -1,11 +1,26 @@
 from decimal import Decimal
 from typing import List, Optional
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
+from store.core import encoding
+from store.core.config import get_settings
 from store.core.exceptions import InsertionException, NotFoundException
 
 from store.schemas.product import ProductIn, ProductOut, ProductUpdate, ProductUpdateOut
 from store.usecases.product import ProductUsecase
+from store.usecases.product_changes import ProductChangesUsecase
 
 router = APIRouter(tags=["products"])
 
@@ -20,6 +35,56 @@ async def post(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
 
 
+@router.get(path="/changes", status_code=status.HTTP_200_OK)
+async def changes(
+    ids: Optional[List[UUID4]] = Query(None, description="Only these products"),
+    min_price: Optional[Decimal] = Query(None, description="Minimum price filter"),
+    max_price: Optional[Decimal] = Query(None, description="Maximum price filter"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    usecase: ProductChangesUsecase = Depends(),
+) -> StreamingResponse:
+    changes = usecase.stream(
+        last_event_id=last_event_id,
+        ids=ids,
+        min_price=min_price,
+        max_price=max_price,
+        heartbeat=get_settings().SSE_HEARTBEAT_SECONDS,
+    )
+
+    async def events():
+        async for change in changes:
+            if change is None:
+                yield ": keep-alive\n\n"
+                continue
+
+            event_id, event = change
+            # resync não tem id: o cliente mantém o último que recebeu
+            id_line = f"id: {event_id}\n" if event_id else ""
+            yield f"{id_line}event: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(path="/export", status_code=status.HTTP_200_OK)
+async def export(
+    request: Request, usecase: ProductUsecase = Depends()
+) -> StreamingResponse:
+    media_type = encoding.negotiate(
+        request.headers.get("accept"),
+        [encoding.NDJSON, encoding.MSGPACK, encoding.COLUMNAR_JSON],
+    )
+
+    return StreamingResponse(
+        encoding.encode_stream(usecase.stream(), ProductOut, media_type),
+        media_type=media_type,
+        headers={"Vary": "Accept"},
+    )
+
+
 @router.get(path="/{id}", status_code=status.HTTP_200_OK)
 async def get(
     id: UUID4 = Path(alias="id"), usecase: ProductUsecase = Depends()
@@ -32,11 +97,40 @@ async def get(
 
 @router.get(path="/", status_code=status.HTTP_200_OK)
 async def query(
+    request: Request,
+    response: Response,
     min_price: Optional[Decimal] = Query(None, description="Minimum price filter"),
     max_price: Optional[Decimal] = Query(None, description="Maximum price filter"),
+    total: bool = Query(False, description="Return X-Total-Count header"),
+    exact: bool = Query(False, description="Use an exact, uncached total count"),
     usecase: ProductUsecase = Depends(),
 ) -> List[ProductOut]:
-    return await usecase.query(min_price=min_price, max_price=max_price)
+    if total:
+        count = await usecase.count(
+            min_price=min_price, max_price=max_price, exact=exact
+        )
+        response.headers["X-Total-Count"] = str(count)
+
+    products = await usecase.query(min_price=min_price, max_price=max_price)
+
+    # O corpo depende do Accept: caches compartilhados precisam saber disso
+    response.headers["Vary"] = "Accept"
+    media_type = encoding.negotiate(
+        request.headers.get("accept"),
+        [encoding.JSON, encoding.MSGPACK, encoding.COLUMNAR_JSON],
+    )
+    if media_type == encoding.JSON:
+        return products
+
+    return Response(
+        content=encoding.encode(products, ProductOut, media_type),
+        media_type=media_type,
+        headers={
+            name: value
+            for name, value in response.headers.items()
+            if name != "content-length"
+        },
+    )  # type: ignore
 
 
 @router.patch(path="/{id}", status_code=status.HTTP_200_OK)
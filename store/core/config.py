@@ -1,16 +1,111 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, Literal
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Modos aceitos em MONGO_PROFILES[...]["read_preference"]
+READ_PREFERENCE_MODES = (
+    "primary",
+    "primaryPreferred",
+    "secondary",
+    "secondaryPreferred",
+    "nearest",
+)
+
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Store API"
     ROOT_PATH: str = "/"
 
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+
     MONGO_HOST: str
     MONGO_ROOT_USER: str
     MONGO_ROOT_PASSWORD: str
     MONGO_DB_PORT: int = 27017
     MONGO_DB_NAME: str = "banco_store"
 
+    # Perfis de roteamento: read_preference (+ max_staleness_seconds),
+    # read_concern, write_concern (+ journal, wtimeout_ms).
+    MONGO_PROFILES: Dict[str, Dict[str, Any]] = {
+        "browse": {
+            "read_preference": "secondaryPreferred",
+            "max_staleness_seconds": 90,
+            "read_concern": "local",
+        },
+        "stock_write": {
+            "read_preference": "primary",
+            "write_concern": "majority",
+            "journal": True,
+        },
+        "bulk": {"read_preference": "primary", "write_concern": 1},
+        "primary": {"read_preference": "primary"},
+    }
+    # Método do ProductUsecase -> perfil
+    MONGO_OPERATION_PROFILES: Dict[str, str] = {
+        "get": "browse",
+        "query": "browse",
+        "count": "browse",
+        "stream": "browse",
+        "create": "stock_write",
+        "update": "stock_write",
+        "delete": "stock_write",
+        "bulk_create": "bulk",
+    }
+    # "MÉTODO /caminho/da/rota" -> perfil usado por todas as operações da rota
+    MONGO_ROUTE_PROFILES: Dict[str, str] = {}
+
+    # "minor_units" guarda preços como int64 na escala PRICE_SCALE. Ative
+    # PRICE_DUAL_READ enquanto a migração dos documentos existentes roda.
+    PRICE_STORAGE: Literal["decimal128", "minor_units"] = "decimal128"
+    PRICE_SCALE: int = 3
+    PRICE_DUAL_READ: bool = False
+
+    COUNT_CACHE_TTL: float = 5.0
+
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+    # Uma chave pendente há mais tempo que isso é de um worker que morreu e
+    # pode ser assumida por uma nova tentativa. Deve ser maior que a
+    # requisição mais lenta.
+    IDEMPOTENCY_LEASE_SECONDS: float = 60.0
+
+    WARMUP_PRELOAD_CACHES: bool = False
+
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    CHANGE_STREAM_ENABLED: bool = True
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    # Clientes recuperando eventos direto do oplog ao mesmo tempo, por worker
+    SSE_MAX_CATCH_UPS: int = 8
+    # Quanto a inicialização espera o change stream abrir antes de aceitar
+    # conexões
+    CHANGE_STREAM_STARTUP_TIMEOUT: float = 10.0
+
+    @model_validator(mode="after")
+    def check_mongo_profiles(self) -> "Settings":
+        # Vêm de JSON no ambiente: um erro de digitação deve parar a
+        # inicialização, não virar um 500 na primeira requisição.
+        for name, profile in self.MONGO_PROFILES.items():
+            mode = profile.get("read_preference")
+            if mode is not None and mode not in READ_PREFERENCE_MODES:
+                raise ValueError(
+                    f"MONGO_PROFILES[{name!r}] has unknown read_preference {mode!r}"
+                )
+
+        for setting in ("MONGO_OPERATION_PROFILES", "MONGO_ROUTE_PROFILES"):
+            for key, name in getattr(self, setting).items():
+                if name not in self.MONGO_PROFILES:
+                    raise ValueError(
+                        f"{setting}[{key!r}] uses unknown profile {name!r}"
+                    )
+
+        return self
+
     @property
     def DATABASE_URL(self) -> str:
         return (
@@ -21,4 +116,6 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()  # type: ignore
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()  # type: ignore
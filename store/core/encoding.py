@@ -0,0 +1,131 @@
+import json
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Type
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+# {"fields": [...], "rows": [[...], ...]}: os nomes dos campos aparecem uma vez
+COLUMNAR_JSON = "application/vnd.store.columnar+json"
+
+
+def available(offers: Iterable[str]) -> List[str]:
+    return [offer for offer in offers if offer != MSGPACK or msgpack is not None]
+
+
+def parse_accept(accept: Optional[str]) -> List[Tuple[str, float]]:
+    ranges = []
+    for item in (accept or "").split(","):
+        media_range, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range.strip(), quality))
+    return ranges
+
+
+def specificity(media_range: str, offer: str) -> int:
+    """How specifically ``media_range`` matches ``offer``, -1 if it doesn't."""
+    if media_range == offer:
+        return 2
+    if media_range == f"{offer.split('/')[0]}/*":
+        return 1
+    if media_range == "*/*":
+        return 0
+    return -1
+
+
+def negotiate(accept: Optional[str], offers: List[str]) -> str:
+    """Pick the offer with the highest quality in ``accept``.
+
+    Each offer takes the quality of the most specific range that matches
+    it (RFC 9110, 12.5.1), so ``application/*;q=0.9, application/json;q=0.1``
+    prefers any other application type to JSON. The first offer is the
+    default when nothing acceptable is listed.
+    """
+    offers = available(offers)
+    ranges = parse_accept(accept)
+    best, best_score = offers[0], (0.0, 0)
+
+    for offer in offers:
+        matches = [
+            (specificity(media_range, offer), quality)
+            for media_range, quality in ranges
+        ]
+        matches = [match for match in matches if match[0] >= 0]
+        if not matches:
+            continue
+
+        # Com a mesma qualidade, a oferta casada por um tipo exato vence
+        matched, quality = max(matches)
+        if quality > 0 and (quality, matched) > best_score:
+            best, best_score = offer, (quality, matched)
+
+    return best
+
+
+def encode(items: List[BaseModel], model: Type[BaseModel], media_type: str) -> bytes:
+    rows = [item.model_dump(mode="json") for item in items]
+
+    if media_type == MSGPACK:
+        return msgpack.packb(rows)
+
+    if media_type == COLUMNAR_JSON:
+        fields = list(model.model_fields)
+        return json.dumps(
+            {"fields": fields, "rows": [[row[f] for f in fields] for row in rows]},
+            separators=(",", ":"),
+        ).encode()
+
+    return json.dumps(rows, separators=(",", ":")).encode()
+
+
+async def encode_stream(
+    items: AsyncIterator[BaseModel],
+    model: Type[BaseModel],
+    media_type: str,
+    chunk_size: int = 100,
+) -> AsyncIterator[bytes]:
+    """Encode ``items`` incrementally, ``chunk_size`` items per chunk.
+
+    NDJSON and MessagePack are emitted as one value per item, columnar
+    JSON as a single document whose rows are streamed.
+    """
+    fields = list(model.model_fields)
+    columnar = media_type == COLUMNAR_JSON
+    separator = b""
+    chunk: List[bytes] = []
+
+    if columnar:
+        yield json.dumps({"fields": fields}, separators=(",", ":"))[:-1].encode()
+        yield b',"rows":['
+
+    async for item in items:
+        row = item.model_dump(mode="json")
+        if media_type == MSGPACK:
+            chunk.append(msgpack.packb(row))
+        elif columnar:
+            value = json.dumps([row[f] for f in fields], separators=(",", ":"))
+            chunk.append(separator + value.encode())
+            separator = b","
+        else:
+            chunk.append(json.dumps(row, separators=(",", ":")).encode() + b"\n")
+
+        if len(chunk) == chunk_size:
+            yield b"".join(chunk)
+            chunk = []
+
+    if chunk:
+        yield b"".join(chunk)
+    if columnar:
+        yield b"]}"
@@ -0,0 +1,77 @@
+import asyncio
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Iterator, List, Optional, Set, Tuple
+
+# (sequência local, id do evento, evento)
+Entry = Tuple[int, str, Any]
+
+
+class Subscription:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.queue: "asyncio.Queue[Optional[Entry]]" = asyncio.Queue()
+
+
+class EventBus:
+    """In-process fan-out of events with a bounded replay history.
+
+    Subscribers that fall ``maxsize`` events behind are dropped (they
+    receive ``None``) and are expected to reconnect with their last event
+    id, which is replayed from the history.
+    """
+
+    def __init__(self, history: int = 1000) -> None:
+        self.history: Deque[Entry] = deque(maxlen=history)
+        self.subscriptions: Set[Subscription] = set()
+        self.sequence = itertools.count(1)
+        # Quando um change stream alimenta o barramento, as publicações
+        # locais são ignoradas para não duplicar eventos, exceto as dos
+        # tipos em local_types, que a fonte externa não descreve por inteiro.
+        self.external_source = False
+        self.local_types: Set[str] = set()
+        self.closed = False
+
+    def publish(self, event: Any, event_id: Optional[str] = None) -> None:
+        sequence = next(self.sequence)
+        entry = (sequence, event_id or str(sequence), event)
+        self.history.append(entry)
+
+        for subscription in list(self.subscriptions):
+            if subscription.queue.qsize() >= subscription.maxsize:
+                self.subscriptions.discard(subscription)
+                subscription.queue.put_nowait(None)
+                continue
+            subscription.queue.put_nowait(entry)
+
+    def publish_local(self, event: Any) -> None:
+        if not self.external_source or getattr(event, "type", None) in self.local_types:
+            self.publish(event)
+
+    def since(self, event_id: str) -> Optional[List[Entry]]:
+        """Entries published after ``event_id``, or None if it is unknown."""
+        entries = list(self.history)
+        for position, (_, entry_id, _) in enumerate(entries):
+            if entry_id == event_id:
+                return entries[position + 1 :]
+        return None
+
+    def close(self) -> None:
+        """End every subscription, including the ones opened later."""
+        self.closed = True
+        for subscription in list(self.subscriptions):
+            subscription.queue.put_nowait(None)
+        self.subscriptions.clear()
+
+    @contextmanager
+    def subscribe(self, maxsize: int = 1000) -> Iterator[Subscription]:
+        subscription = Subscription(maxsize=maxsize)
+        if self.closed:
+            subscription.queue.put_nowait(None)
+        else:
+            self.subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.discard(subscription)
@@ -12,3 +12,15 @@ class NotFoundException(BaseException):
 
 class InsertionException(BaseException):
     message = "Falha ao inserir produto"
+
+
+class IdempotencyConflictException(BaseException):
+    message = "A request with this Idempotency-Key is still in progress"
+
+
+class IdempotencyMismatchException(BaseException):
+    message = "Idempotency-Key was already used with a different request"
+
+
+class PriceStorageException(BaseException):
+    message = "Set PRICE_STORAGE=minor_units before migrating prices"
@@ -0,0 +1,233 @@
+import hashlib
+import zlib
+from typing import Any, Dict, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from store.core.encoding import parse_accept
+from store.core.exceptions import (
+    IdempotencyConflictException,
+    IdempotencyMismatchException,
+)
+from store.usecases.idempotency import IdempotencyUsecase
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response for retried requests with an Idempotency-Key."""
+
+    methods = {"POST", "PATCH"}
+    header = "idempotency-key"
+    replayed_header = "idempotency-replayed"
+    stored_headers = ("content-type", "location")
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = Headers(scope=scope).get(self.header)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        key = f"{scope['method']} {scope['path']} {idempotency_key}"
+        fingerprint = hashlib.sha256(body).hexdigest()
+        usecase = IdempotencyUsecase()
+
+        try:
+            stored = await usecase.claim(key=key, fingerprint=fingerprint)
+        except IdempotencyConflictException as exc:
+            response: Response = JSONResponse({"detail": exc.message}, status_code=409)
+            await response(scope, receive, send)
+            return
+        except IdempotencyMismatchException as exc:
+            response = JSONResponse({"detail": exc.message}, status_code=422)
+            await response(scope, receive, send)
+            return
+
+        if stored is not None:
+            response = Response(
+                content=stored["body"],
+                status_code=stored["status_code"],
+                headers={**stored["headers"], self.replayed_header: "true"},
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        headers: Dict[str, str] = {}
+        chunks: List[bytes] = []
+        body_sent = False
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_capture(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = Headers(raw=message.get("headers", []))
+                headers = {
+                    name: response_headers[name]
+                    for name in self.stored_headers
+                    if name in response_headers
+                }
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_capture)
+        except BaseException:
+            await usecase.release(key=key)
+            raise
+
+        # Erros de servidor não são armazenados para que o cliente possa tentar de novo
+        if status_code >= 500:
+            await usecase.release(key=key)
+            return
+
+        await usecase.complete(
+            key=key, status_code=status_code, headers=headers, body=b"".join(chunks)
+        )
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        return body
+
+
+class GzipCompressor:
+    def __init__(self) -> None:
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def process(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self) -> None:
+        self.compressor = brotli.Compressor(quality=4)
+
+    def process(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress responses above ``minimum_size`` with brotli or gzip.
+
+    Bodies are compressed chunk by chunk as the application sends them, so
+    streaming responses are never buffered whole.
+    """
+
+    excluded_media_types = ("text/event-stream",)
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    def select_encoding(self, scope: Scope) -> Optional[str]:
+        """Coding with the highest q in Accept-Encoding, None for identity.
+
+        Codings with ``q=0`` are never used, ``*`` covers the codings not
+        listed, and an ``identity`` ranked above every coding disables
+        compression.
+        """
+        header = Headers(scope=scope).get("accept-encoding")
+        if not header:
+            return None
+
+        qualities = {
+            coding.lower(): quality for coding, quality in parse_accept(header)
+        }
+        wildcard = qualities.get("*", 0.0)
+
+        def quality(coding: str) -> float:
+            return qualities.get(coding, wildcard)
+
+        codings = (["br"] if brotli is not None else []) + ["gzip"]
+        # Em caso de empate vale a ordem de preferência do servidor
+        best = max(codings, key=quality)
+        identity = qualities.get("identity", 1.0 if "*" not in qualities else wildcard)
+        if quality(best) <= 0 or identity > quality(best):
+            return None
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self.select_encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Any = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                passthrough = "content-encoding" in headers or headers.get(
+                    "content-type", ""
+                ).startswith(self.excluded_media_types)
+                if passthrough:
+                    # Streams como SSE recebem status e cabeçalhos na hora
+                    await send(message)
+                    return
+                # Segura o início até saber se o corpo passa do tamanho mínimo
+                start = message
+                return
+
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start)
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+
+                compressor = (
+                    BrotliCompressor() if encoding == "br" else GzipCompressor()
+                )
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("accept-encoding")
+                del headers["content-length"]
+                await send(start)
+
+            data = compressor.process(body)
+            if not more_body:
+                data += compressor.finish()
+            await send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_compressed)
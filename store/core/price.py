@@ -0,0 +1,85 @@
+from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_EVEN, Decimal
+from typing import Any, Dict, Optional, TypeVar
+from bson import Decimal128
+
+from store.core.config import get_settings
+
+SCALE_SUFFIX = "_scale"
+
+T = TypeVar("T")
+
+
+def to_minor_units(value: Any, scale: int, rounding: Optional[str] = None) -> int:
+    """Convert ``value`` to an integer number of ``10 ** -scale`` units.
+
+    Without ``rounding``, values with more than ``scale`` decimal places
+    raise ValueError instead of being stored as a different price.
+    """
+    scaled = Decimal(str(value)).scaleb(scale)
+    if rounding is None:
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"{value} has more than {scale} decimal places")
+        rounding = ROUND_HALF_EVEN
+    return int(scaled.quantize(Decimal(1), rounding))
+
+
+def from_minor_units(value: int, scale: int) -> Decimal:
+    return Decimal(value).scaleb(-scale)
+
+
+def check_scale(value: T) -> T:
+    """Reject decimals that the configured storage would have to round."""
+    settings = get_settings()
+    if value is not None and settings.PRICE_STORAGE == "minor_units":
+        to_minor_units(value, settings.PRICE_SCALE)
+    return value
+
+
+def encode_decimal(key: str, value: Any) -> Dict[str, Any]:
+    """Fields to store for a decimal ``value`` in the configured format.
+
+    Minor units are stored as an int64 next to a ``<key>_scale`` field,
+    which is what tells readers how to decode them.
+    """
+    settings = get_settings()
+    if settings.PRICE_STORAGE == "minor_units":
+        scale = settings.PRICE_SCALE
+        return {key: to_minor_units(value, scale), key + SCALE_SUFFIX: scale}
+
+    return {key: Decimal128(str(value))}
+
+
+def range_filter(
+    key: str, minimum: Optional[Decimal] = None, maximum: Optional[Decimal] = None
+) -> Dict[str, Any]:
+    """Mongo filter for ``minimum <= key <= maximum`` in the stored format.
+
+    With PRICE_DUAL_READ, documents in both formats are matched, which is
+    needed while a migration between them is running.
+    """
+    if minimum is None and maximum is None:
+        return {}
+
+    settings = get_settings()
+    scale = settings.PRICE_SCALE
+
+    legacy, minor = {}, {}
+    if minimum is not None:
+        legacy["$gte"] = Decimal128(str(minimum))
+        minor["$gte"] = to_minor_units(minimum, scale, ROUND_CEILING)
+    if maximum is not None:
+        legacy["$lte"] = Decimal128(str(maximum))
+        minor["$lte"] = to_minor_units(maximum, scale, ROUND_FLOOR)
+
+    if settings.PRICE_DUAL_READ:
+        return {
+            "$or": [
+                {key + SCALE_SUFFIX: {"$exists": False}, key: legacy},
+                {key + SCALE_SUFFIX: scale, key: minor},
+            ]
+        }
+
+    if settings.PRICE_STORAGE == "minor_units":
+        return {key: minor}
+
+    return {key: legacy}
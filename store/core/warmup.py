@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from fastapi import FastAPI
+
+from store.core.config import get_settings
+from store.db.mongo import db_client
+from store.models.product import ProductModel
+from store.schemas.product import ProductIn, ProductOut, ProductUpdate, ProductUpdateOut
+from store.usecases.idempotency import IdempotencyUsecase
+from store.usecases.product import ProductUsecase
+
+
+def warm_up_schemas(app: FastAPI) -> None:
+    """Run a sample product through every validator and serializer."""
+    body = ProductIn(name="warm-up", quantity=1, price=Decimal("1.000"), status=True)
+    document = ProductModel(**body.model_dump()).model_dump()
+
+    ProductOut(**dict(document)).model_dump_json()
+    ProductUpdate(price=Decimal("1.000"), updated_at=datetime.now(timezone.utc))
+    ProductUpdateOut(**dict(document)).model_dump(mode="json")
+    app.openapi()
+
+
+async def warm_up(app: FastAPI) -> None:
+    await db_client.get().admin.command("ping")
+    await IdempotencyUsecase().ensure_indexes()
+    await ProductUsecase().ensure_indexes()
+
+    warm_up_schemas(app)
+
+    if get_settings().WARMUP_PRELOAD_CACHES:
+        # Traz o catálogo para o cache do Mongo antes da primeira requisição
+        usecase = ProductUsecase()
+        await usecase.count()
+        async for _ in usecase.stream():
+            pass
+
+    app.state.ready = True
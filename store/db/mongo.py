@@ -1,16 +1,39 @@
+import os
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from store.core.config import settings
+from store.core.config import get_settings
+from store.db.monitoring import read_metrics
 
 
 class MongoClient:
+    """Process-local Motor client.
+
+    The client (and its connection pools) is created on first use and
+    recreated after a fork, so each server worker owns its own pools.
+    """
+
     def __init__(self) -> None:
-        self.client: "AsyncIOMotorClient" = AsyncIOMotorClient(  # type: ignore
-            settings.DATABASE_URL, uuidRepresentation="standard"
-        )
+        self.client: Optional["AsyncIOMotorClient"] = None  # type: ignore
+        self.pid: Optional[int] = None
 
     def get(self) -> "AsyncIOMotorClient":  # type: ignore
+        if self.client is None or self.pid != os.getpid():
+            self.client = AsyncIOMotorClient(  # type: ignore
+                get_settings().DATABASE_URL,
+                uuidRepresentation="standard",
+                event_listeners=[read_metrics],
+            )
+            self.pid = os.getpid()
+
         return self.client
 
+    def close(self) -> None:
+        if self.client is not None and self.pid == os.getpid():
+            self.client.close()
+
+        self.client = None
+        self.pid = None
+
 
 db_client = MongoClient()
@@ -0,0 +1,58 @@
+import threading
+from collections import Counter
+from typing import Dict, Tuple
+from pymongo import monitoring
+
+Address = Tuple[str, int]
+
+
+class ReadMetrics(monitoring.CommandListener, monitoring.ServerListener):
+    """Count read commands by the type of server that answered them.
+
+    pymongo calls listeners from Motor's executor threads, so the counters
+    are only touched while holding ``lock``.
+    """
+
+    read_commands = {"find", "getMore", "aggregate", "count", "distinct"}
+
+    def __init__(self) -> None:
+        self.server_types: Dict[Address, str] = {}
+        self.reads: "Counter[Tuple[str, str]]" = Counter()
+        self.lock = threading.Lock()
+
+    def opened(self, event: monitoring.ServerOpeningEvent) -> None:
+        pass
+
+    def description_changed(
+        self, event: monitoring.ServerDescriptionChangedEvent
+    ) -> None:
+        server_type = event.new_description.server_type_name
+        with self.lock:
+            self.server_types[event.server_address] = server_type
+
+    def closed(self, event: monitoring.ServerClosedEvent) -> None:
+        with self.lock:
+            self.server_types.pop(event.server_address, None)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        if event.command_name in self.read_commands:
+            with self.lock:
+                server_type = self.server_types.get(event.connection_id, "Unknown")
+                self.reads[(server_type, event.command_name)] += 1
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        result: Dict[str, Dict[str, int]] = {}
+        with self.lock:
+            reads = list(self.reads.items())
+        for (server_type, command), total in reads:
+            result.setdefault(server_type, {})[command] = total
+        return result
+
+
+read_metrics = ReadMetrics()
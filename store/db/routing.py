@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import read_preferences
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+from store.core.config import get_settings
+
+# As chaves correspondem a READ_PREFERENCE_MODES, validado em Settings
+READ_PREFERENCES = {
+    "primary": read_preferences.Primary,
+    "primaryPreferred": read_preferences.PrimaryPreferred,
+    "secondary": read_preferences.Secondary,
+    "secondaryPreferred": read_preferences.SecondaryPreferred,
+    "nearest": read_preferences.Nearest,
+}
+
+_profile_override: ContextVar[Optional[str]] = ContextVar(
+    "mongo_profile_override", default=None
+)
+
+
+def collection_options(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate a MONGO_PROFILES entry into ``with_options`` arguments."""
+    options: Dict[str, Any] = {}
+
+    if "read_preference" in profile:
+        mode = READ_PREFERENCES[profile["read_preference"]]
+        staleness = profile.get("max_staleness_seconds")
+        options["read_preference"] = (
+            mode(max_staleness=staleness)
+            if staleness and mode is not read_preferences.Primary
+            else mode()
+        )
+    if "read_concern" in profile:
+        options["read_concern"] = ReadConcern(profile["read_concern"])
+    if "write_concern" in profile:
+        options["write_concern"] = WriteConcern(
+            w=profile["write_concern"],
+            j=profile.get("journal"),
+            wtimeout=profile.get("wtimeout_ms"),
+        )
+
+    return options
+
+
+class RoutingPolicy:
+    """Pick read preference, read concern and write concern per operation.
+
+    Operations map to named profiles through MONGO_OPERATION_PROFILES; a
+    route listed in MONGO_ROUTE_PROFILES (or code inside ``use_profile``)
+    forces one profile for every operation it runs.
+    """
+
+    def profile_for(self, operation: str) -> Optional[str]:
+        return _profile_override.get() or get_settings().MONGO_OPERATION_PROFILES.get(
+            operation
+        )
+
+    def collection(
+        self, collection: "AsyncIOMotorCollection", operation: str  # type: ignore
+    ) -> "AsyncIOMotorCollection":  # type: ignore
+        name = self.profile_for(operation)
+        if name is None:
+            return collection
+
+        profile = get_settings().MONGO_PROFILES[name]
+        return collection.with_options(**collection_options(profile))
+
+    @contextmanager
+    def use_profile(self, name: Optional[str]) -> Iterator[None]:
+        token = _profile_override.set(name)
+        try:
+            yield
+        finally:
+            _profile_override.reset(token)
+
+
+async def route_profile(request: Request) -> None:
+    """Router dependency applying MONGO_ROUTE_PROFILES to the current request."""
+    route = request.scope.get("route")
+    key = f"{request.method} {getattr(route, 'path', request.url.path)}"
+    # Sempre definido (inclusive como None) para não herdar o valor de outra
+    # requisição atendida na mesma task.
+    _profile_override.set(get_settings().MONGO_ROUTE_PROFILES.get(key))
+
+
+routing_policy = RoutingPolicy()
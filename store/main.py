@@ -1,19 +1,69 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
 from fastapi import FastAPI
 
-from store.core.config import settings
+from store.core.config import get_settings
+from store.core.middlewares import CompressionMiddleware, IdempotencyMiddleware
+from store.core.warmup import warm_up
+from store.db.mongo import db_client
 from store.routers import api_router
+from store.usecases.product import product_events
+from store.usecases.product_changes import ProductChangesUsecase
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await warm_up(app)
+    product_events.closed = False
+
+    settings = get_settings()
+    watcher = None
+    if settings.CHANGE_STREAM_ENABLED:
+        started = asyncio.Event()
+        watcher = asyncio.create_task(ProductChangesUsecase().watch(started=started))
+        # Um cliente que reconecta antes do stream abrir perderia o replay
+        try:
+            await asyncio.wait_for(
+                started.wait(), timeout=settings.CHANGE_STREAM_STARTUP_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Product change stream not open yet, starting anyway")
+
+    yield
+
+    app.state.ready = False
+    product_events.close()
+    if watcher is not None:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+    # Roda depois que o servidor drenou as requisições em andamento
+    db_client.close()
 
 
 class App(FastAPI):
     def __init__(self, *args, **kwargs) -> None:
+        settings = get_settings()
         super().__init__(
             *args,
             **kwargs,
             version="0.0.1",
             title=settings.PROJECT_NAME,
-            root_path=settings.ROOT_PATH
+            root_path=settings.ROOT_PATH,
+            lifespan=lifespan,
         )
+        self.state.ready = False
 
 
-app = App()
-app.include_router(api_router)
+def create_app() -> App:
+    app = App()
+    app.add_middleware(IdempotencyMiddleware)
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=get_settings().COMPRESSION_MINIMUM_SIZE
+    )
+    app.include_router(api_router)
+    return app
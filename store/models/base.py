@@ -2,8 +2,8 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any
 import uuid
-from bson import Decimal128
 from pydantic import UUID4, BaseModel, Field, model_serializer
+from store.core.price import encode_decimal
 
 
 class CreateBaseModel(BaseModel):
@@ -15,8 +15,8 @@ class CreateBaseModel(BaseModel):
     def set_model(self) -> dict[str, Any]:
         self_dict = dict(self)
 
-        for key, value in self_dict.items():
+        for key, value in dict(self_dict).items():
             if isinstance(value, Decimal):
-                self_dict[key] = Decimal128(str(value))
+                self_dict.update(encode_decimal(key, value))
 
         return self_dict
@@ -1,5 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from store.controllers.health import router as health
+from store.controllers.metrics import router as metrics
 from store.controllers.product import router as product
+from store.db.routing import route_profile
 
 api_router = APIRouter()
-api_router.include_router(product, prefix="/products")
+api_router.include_router(health, prefix="/health")
+api_router.include_router(metrics, prefix="/metrics")
+api_router.include_router(
+    product, prefix="/products", dependencies=[Depends(route_profile)]
+)
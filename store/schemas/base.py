@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from bson import Decimal128
 from pydantic import UUID4, BaseModel, Field, model_validator
+from store.core.price import SCALE_SUFFIX, from_minor_units
 
 
 class BaseSchemaMixin(BaseModel):
@@ -21,6 +22,8 @@ class OutSchema(BaseModel):
         for key, value in data.items():
             if isinstance(value, Decimal128):
                 data[key] = Decimal(str(value))
+            elif type(value) is int and key + SCALE_SUFFIX in data:
+                data[key] = from_minor_units(value, data[key + SCALE_SUFFIX])
             elif isinstance(value, datetime) and value.tzinfo is None:
                 data[key] = value.replace(tzinfo=timezone.utc)
         return data
@@ -1,8 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Annotated, Optional
-from bson import Decimal128
-from pydantic import AfterValidator, Field
+from typing import Literal, Optional
+from pydantic import UUID4, Field, field_validator
+from store.core.price import check_scale
 from store.schemas.base import BaseSchemaMixin, OutSchema
 
 
@@ -12,28 +12,40 @@ class ProductBase(BaseSchemaMixin):
     price: Decimal = Field(..., description="Product price")
     status: bool = Field(..., description="Product status")
 
+    @field_validator("price")
+    def check_price_scale(cls, value: Decimal) -> Decimal:
+        return check_scale(value)
+
 
 class ProductIn(ProductBase, BaseSchemaMixin):
     ...
 
 
 class ProductOut(ProductIn, OutSchema):
-    ...
-
-
-def convert_decimal_128(v):
-    return Decimal128(str(v))
-
-
-Decimal_ = Annotated[Decimal, AfterValidator(convert_decimal_128)]
+    @field_validator("price")
+    def check_price_scale(cls, value: Decimal) -> Decimal:
+        # Preços já gravados são lidos como estão, mesmo fora da escala
+        return value
 
 
 class ProductUpdate(BaseSchemaMixin):
     quantity: Optional[int] = Field(None, description="Product quantity")
-    price: Optional[Decimal_] = Field(None, description="Product price")
+    price: Optional[Decimal] = Field(None, description="Product price")
     status: Optional[bool] = Field(None, description="Product status")
     updated_at: Optional[datetime] = Field(None, description="Product update timestamp")
 
+    @field_validator("price")
+    def check_price_scale(cls, value: Optional[Decimal]) -> Optional[Decimal]:
+        return check_scale(value)
+
 
 class ProductUpdateOut(ProductOut):
     ...
+
+
+class ProductEventOut(BaseSchemaMixin):
+    type: Literal["create", "update", "delete", "resync"] = Field(
+        ..., description="Change, or resync when the client must reload"
+    )
+    id: Optional[UUID4] = Field(None, description="Product id")
+    product: Optional[ProductOut] = Field(None, description="Product after change")
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+import uuid
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+from store.core.config import get_settings
+from store.core.exceptions import (
+    IdempotencyConflictException,
+    IdempotencyMismatchException,
+)
+from store.db.mongo import db_client
+
+# Waiters in this process are woken as soon as the key is resolved; the poll
+# interval only matters when the in-flight request lives in another worker.
+POLL_INTERVAL = 0.1
+
+_waiters: Dict[str, asyncio.Event] = {}
+
+
+class IdempotencyUsecase:
+    indexes_ready: bool = False
+
+    def __init__(self) -> None:
+        client = db_client.get()
+        database = client.get_database()
+        self.client: "AsyncIOMotorClient" = client  # type: ignore
+        self.database: "AsyncIOMotorDatabase" = database  # type: ignore
+        self.collection = self.database.get_collection("idempotency_keys")
+        # Identifica este dono da chave: só ele completa ou libera o claim
+        self.owner = uuid.uuid4().hex
+
+    async def ensure_indexes(self) -> None:
+        if IdempotencyUsecase.indexes_ready:
+            return
+
+        await self.collection.create_index(
+            "created_at", expireAfterSeconds=get_settings().IDEMPOTENCY_TTL_SECONDS
+        )
+        IdempotencyUsecase.indexes_ready = True
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Reserve ``key`` for this request.
+
+        Returns ``None`` when the caller now owns the key and must run the
+        request, or the stored response when an earlier request completed.
+        A pending claim whose lease expired (its worker died before
+        releasing it) is taken over.
+        """
+        await self.ensure_indexes()
+        settings = get_settings()
+        lease = timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        event: Optional[asyncio.Event] = None
+
+        try:
+            while True:
+                now = datetime.now(timezone.utc)
+                try:
+                    await self.collection.insert_one(
+                        {
+                            "_id": key,
+                            "fingerprint": fingerprint,
+                            "state": "pending",
+                            "owner": self.owner,
+                            "locked_until": now + lease,
+                            "created_at": now,
+                        }
+                    )
+                    return None
+                except DuplicateKeyError:
+                    pass
+
+                stored = await self.collection.find_one({"_id": key})
+                if stored is None:
+                    # Liberada (ou expirada) entre o insert e a leitura
+                    continue
+
+                if stored["fingerprint"] != fingerprint:
+                    raise IdempotencyMismatchException()
+
+                if stored["state"] == "completed":
+                    return stored
+
+                taken = await self.collection.find_one_and_update(
+                    {"_id": key, "state": "pending", "locked_until": {"$lt": now}},
+                    {"$set": {"owner": self.owner, "locked_until": now + lease}},
+                )
+                if taken is not None:
+                    return None
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise IdempotencyConflictException()
+
+                event = _waiters.setdefault(key, asyncio.Event())
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), timeout=min(POLL_INTERVAL, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Se o dono está em outro worker, _notify nunca roda aqui
+            if event is not None and _waiters.get(key) is event:
+                del _waiters[key]
+
+    async def complete(
+        self, key: str, status_code: int, headers: Dict[str, str], body: bytes
+    ) -> None:
+        await self.collection.update_one(
+            {"_id": key, "owner": self.owner},
+            {
+                "$set": {
+                    "state": "completed",
+                    "status_code": status_code,
+                    "headers": headers,
+                    "body": body,
+                }
+            },
+        )
+        self._notify(key)
+
+    async def release(self, key: str) -> None:
+        await self.collection.delete_one(
+            {"_id": key, "state": "pending", "owner": self.owner}
+        )
+        self._notify(key)
+
+    def _notify(self, key: str) -> None:
+        event = _waiters.pop(key, None)
+        if event is not None:
+            event.set()
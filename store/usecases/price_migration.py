@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from decimal import InvalidOperation
+from typing import Callable, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+import pymongo
+from store.core.config import get_settings
+from store.core.exceptions import PriceStorageException
+from store.core.price import SCALE_SUFFIX, to_minor_units
+from store.db.mongo import db_client
+
+logger = logging.getLogger(__name__)
+
+
+class PriceMigrationUsecase:
+    """Rewrite Decimal128 prices as int64 minor units, batch by batch.
+
+    Progress is checkpointed in the ``migrations`` collection, so an
+    interrupted run continues after the last migrated ``_id``. Each update
+    only applies if the price is still the one that was read, so it is
+    safe to run while the API is serving writes. Only runs when the API
+    is configured to store minor units, otherwise it would write prices
+    the API cannot filter or would convert back.
+    """
+
+    name = "price_minor_units"
+
+    @property
+    def database(self) -> "AsyncIOMotorDatabase":  # type: ignore
+        return db_client.get().get_database()
+
+    @property
+    def collection(self) -> "AsyncIOMotorCollection":  # type: ignore
+        return self.database.get_collection("products")
+
+    @property
+    def migrations(self) -> "AsyncIOMotorCollection":  # type: ignore
+        return self.database.get_collection("migrations")
+
+    async def reset(self) -> None:
+        await self.migrations.delete_one({"_id": self.name})
+
+    async def run(
+        self,
+        batch_size: int = 500,
+        pause: float = 0.0,
+        on_batch: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        settings = get_settings()
+        if settings.PRICE_STORAGE != "minor_units":
+            raise PriceStorageException()
+
+        scale = settings.PRICE_SCALE
+        state = await self.migrations.find_one({"_id": self.name}) or {}
+        last_id = state.get("last_id")
+        migrated = 0
+
+        while True:
+            query: dict = {"price" + SCALE_SUFFIX: {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+
+            cursor = (
+                self.collection.find(query, {"_id": 1, "price": 1})
+                .sort("_id", pymongo.ASCENDING)
+                .limit(batch_size)
+            )
+            batch = await cursor.to_list(length=batch_size)
+            if not batch:
+                break
+
+            operations = []
+            for document in batch:
+                try:
+                    price = to_minor_units(document["price"], scale)
+                except (KeyError, InvalidOperation, ValueError):
+                    # Preços com mais casas que a escala não são arredondados
+                    logger.warning("Skipping product %s: bad price", document["_id"])
+                    continue
+                operations.append(
+                    pymongo.UpdateOne(
+                        {
+                            "_id": document["_id"],
+                            "price": document["price"],
+                            "price" + SCALE_SUFFIX: {"$exists": False},
+                        },
+                        {"$set": {"price": price, "price" + SCALE_SUFFIX: scale}},
+                    )
+                )
+
+            modified = 0
+            if operations:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                modified = result.modified_count
+                migrated += modified
+
+            last_id = batch[-1]["_id"]
+            await self.migrations.update_one(
+                {"_id": self.name},
+                {
+                    "$set": {
+                        "last_id": last_id,
+                        "updated_at": datetime.now(timezone.utc),
+                    },
+                    "$inc": {"migrated": modified},
+                },
+                upsert=True,
+            )
+            if on_batch is not None:
+                on_batch(len(batch))
+            if pause:
+                # Cede espaço às requisições da API entre os lotes
+                await asyncio.sleep(pause)
+
+        await self.migrations.update_one(
+            {"_id": self.name},
+            {"$set": {"done": True, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+
+        return migrated
@@ -1,61 +1,197 @@
 from decimal import Decimal
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime, timezone
-from bson import Decimal128
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
 import pymongo
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from store.core.cache import TTLCache
+from store.core.events import EventBus
+from store.core.config import get_settings
+from store.core.price import SCALE_SUFFIX, encode_decimal, range_filter
 from store.db.mongo import db_client
+from store.db.routing import routing_policy
 from store.models.product import ProductModel
-from store.schemas.product import ProductIn, ProductOut, ProductUpdate, ProductUpdateOut
+from store.schemas.product import (
+    ProductEventOut,
+    ProductIn,
+    ProductOut,
+    ProductUpdate,
+    ProductUpdateOut,
+)
 from store.core.exceptions import InsertionException, NotFoundException
 
+count_cache = TTLCache()
+product_events = EventBus()
+
+# Código do servidor para violação de índice único
+DUPLICATE_KEY = 11000
+
 
 class ProductUsecase:
-    def __init__(self) -> None:
-        client = db_client.get()
-        database = client.get_database()
-        self.client: "AsyncIOMotorClient" = client  # type: ignore
-        self.database: "AsyncIOMotorDatabase" = database  # type: ignore
-        self.collection = self.database.get_collection("products")
+    indexes_ready: bool = False
+
+    # Resolvidos a cada acesso para que a instância criada no import
+    # (product_usecase) use sempre o client do processo atual.
+    @property
+    def client(self) -> "AsyncIOMotorClient":  # type: ignore
+        return db_client.get()
+
+    @property
+    def database(self) -> "AsyncIOMotorDatabase":  # type: ignore
+        return self.client.get_database()
+
+    @property
+    def collection(self) -> "AsyncIOMotorCollection":  # type: ignore
+        return self.database.get_collection("products")
+
+    def routed(self, operation: str) -> "AsyncIOMotorCollection":  # type: ignore
+        return routing_policy.collection(self.collection, operation)
+
+    async def ensure_indexes(self) -> None:
+        """Make product names unique, so concurrent writers can't repeat them."""
+        if ProductUsecase.indexes_ready:
+            return
+
+        await self.collection.create_index("name", unique=True)
+        ProductUsecase.indexes_ready = True
 
     async def create(self, body: ProductIn) -> ProductOut:
-        existing = await self.collection.find_one({"name": body.name})
+        collection = self.routed("create")
+        existing = await collection.find_one({"name": body.name})
         if existing:
             raise InsertionException(f"Produto de nome '{body.name}' já existe.")
 
         product_model = ProductModel(**body.model_dump())
-        await self.collection.insert_one(product_model.model_dump())
+        try:
+            await collection.insert_one(product_model.model_dump())
+        except DuplicateKeyError:
+            # Criado por outra requisição depois da consulta acima
+            raise InsertionException(f"Produto de nome '{body.name}' já existe.")
+        count_cache.clear()
 
-        return ProductOut(**product_model.model_dump())
+        product = ProductOut(**product_model.model_dump())
+        product_events.publish_local(
+            ProductEventOut(type="create", id=product.id, product=product)
+        )
+
+        return product
 
     async def get(self, id: UUID) -> ProductOut:
-        result = await self.collection.find_one({"id": id})
+        collection = self.routed("get")
+        result = await collection.find_one({"id": id})
 
         if not result:
             raise NotFoundException(message=f"Product not found with filter: {id}")
 
         return ProductOut(**result)
 
+    def _price_filter(
+        self, min_price: Optional[Decimal] = None, max_price: Optional[Decimal] = None
+    ) -> dict:
+        # Converte os limites para o formato em que o preço está guardado
+        return range_filter("price", minimum=min_price, maximum=max_price)
+
+    def _price_update(self, update_data: dict) -> dict:
+        update = {"$set": update_data}
+        if "price" in update_data:
+            update_data.update(encode_decimal("price", update_data["price"]))
+            if "price" + SCALE_SUFFIX not in update_data:
+                # Documento já migrado voltando para Decimal128
+                update["$unset"] = {"price" + SCALE_SUFFIX: ""}
+        return update
+
     async def query(
         self, min_price: Optional[Decimal] = None, max_price: Optional[Decimal] = None
     ) -> List[ProductOut]:
-        # Converte os valores Decimal para Decimal128
-        query = {}
-
-        if min_price is not None or max_price is not None:
-            price_query = {}
-            if min_price is not None:
-                price_query["$gte"] = Decimal128(str(min_price))
-            if max_price is not None:
-                price_query["$lte"] = Decimal128(str(max_price))
-            query["price"] = price_query
+        collection = self.routed("query")
+        query = self._price_filter(min_price=min_price, max_price=max_price)
 
         # Executa a consulta diretamente
-        cursor = self.collection.find(query)
+        cursor = collection.find(query)
         return [ProductOut(**item) async for item in cursor]
 
+    async def count(
+        self,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        exact: bool = False,
+    ) -> int:
+        collection = self.routed("count")
+        query = self._price_filter(min_price=min_price, max_price=max_price)
+
+        if exact:
+            return await collection.count_documents(query)
+
+        # Sem filtro, os metadados da coleção bastam e não varrem documentos
+        if not query:
+            return await collection.estimated_document_count()
+
+        key = (min_price, max_price)
+        total = count_cache.get(key)
+        if total is None:
+            total = await collection.count_documents(query)
+            count_cache.set(key, total, ttl=get_settings().COUNT_CACHE_TTL)
+
+        return total
+
+    async def stream(self, batch_size: int = 1000) -> AsyncIterator[ProductOut]:
+        collection = self.routed("stream")
+        cursor = collection.find({}).batch_size(batch_size)
+        async for item in cursor:
+            yield ProductOut(**item)
+
+    def _upsert_operation(self, model: ProductModel) -> pymongo.UpdateOne:
+        document = model.model_dump()
+        on_insert = {key: document.pop(key) for key in ("id", "created_at")}
+        update = {"$set": document, "$setOnInsert": on_insert}
+        if "price" + SCALE_SUFFIX not in document:
+            update["$unset"] = {"price" + SCALE_SUFFIX: ""}
+
+        return pymongo.UpdateOne({"name": model.name}, update, upsert=True)
+
+    async def bulk_create(
+        self, bodies: List[ProductIn], upsert: bool = False
+    ) -> Dict[int, str]:
+        """Write ``bodies`` in a single unordered batch.
+
+        Returns the error message of each rejected product, keyed by its
+        position in ``bodies``. Repeated names are rejected by the unique
+        index on ``name`` (see ``ensure_indexes``).
+        """
+        collection = self.routed("bulk_create")
+        errors: Dict[int, str] = {}
+        models = [ProductModel(**body.model_dump()) for body in bodies]
+
+        try:
+            if upsert:
+                await collection.bulk_write(
+                    [self._upsert_operation(model) for model in models],
+                    ordered=False,
+                )
+            else:
+                await collection.insert_many(
+                    [model.model_dump() for model in models], ordered=False
+                )
+        except BulkWriteError as exc:
+            for error in exc.details["writeErrors"]:
+                position = error["index"]
+                if error["code"] == DUPLICATE_KEY:
+                    name = models[position].name
+                    errors[position] = f"Produto de nome '{name}' já existe."
+                else:
+                    errors[position] = error["errmsg"]
+
+        count_cache.clear()
+
+        return errors
+
     async def update(self, id: UUID, body: ProductUpdate) -> ProductUpdateOut:
+        collection = self.routed("update")
         update_data = body.model_dump(exclude_none=True)
         if "updated_at" in update_data:
             if isinstance(update_data["updated_at"], str):
@@ -65,22 +201,36 @@ class ProductUsecase:
         else:
             update_data["updated_at"] = datetime.now(timezone.utc)
 
-        result = await self.collection.find_one_and_update(
+        result = await collection.find_one_and_update(
             filter={"id": id},
-            update={"$set": update_data},
+            update=self._price_update(update_data),
             return_document=pymongo.ReturnDocument.AFTER,
         )
         if not result:
             raise NotFoundException(message=f"Produto não encontrado com id : {id}")
 
-        return ProductUpdateOut(**result)
+        if "price" in update_data:
+            count_cache.clear()
+
+        product = ProductUpdateOut(**result)
+        product_events.publish_local(
+            ProductEventOut(type="update", id=product.id, product=product)
+        )
+
+        return product
 
     async def delete(self, id: UUID) -> bool:
-        product = await self.collection.find_one({"id": id})
+        collection = self.routed("delete")
+        product = await collection.find_one({"id": id})
         if not product:
             raise NotFoundException(message=f"Product not found with filter: {id}")
 
-        result = await self.collection.delete_one({"id": id})
+        result = await collection.delete_one({"id": id})
+        count_cache.clear()
+
+        product_events.publish_local(
+            ProductEventOut(type="delete", id=id, product=ProductOut(**product))
+        )
 
         return result.deleted_count > 0
 
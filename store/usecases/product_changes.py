@@ -0,0 +1,270 @@
+import asyncio
+import logging
+from collections import deque
+from decimal import Decimal
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from store.core.config import get_settings
+from store.core.events import Entry, Subscription
+from store.db.mongo import db_client
+from store.schemas.product import ProductEventOut, ProductOut
+from store.usecases.product import product_events
+
+logger = logging.getLogger(__name__)
+
+# Códigos do servidor: change streams exigem replica set; a coleção ainda
+# não existe.
+CHANGE_STREAM_UNSUPPORTED = 40573
+NAMESPACE_NOT_FOUND = 26
+
+# Espera de cada try_next durante a recuperação pelo oplog: cada uma ocupa
+# uma thread do pool do Motor, por isso é curta.
+CATCH_UP_AWAIT_MS = 200
+
+Change = Tuple[str, ProductEventOut]
+
+# Enviado quando o Last-Event-ID não pode ser retomado: o cliente deve
+# recarregar os produtos em vez de seguir com uma lacuna.
+RESYNC: Change = ("", ProductEventOut(type="resync"))
+
+
+class ProductChangesUsecase:
+    # Definido uma vez por watch(); reconexões SSE não repetem o collMod
+    pre_images: bool = False
+    catch_up_slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def database(self) -> "AsyncIOMotorDatabase":  # type: ignore
+        return db_client.get().get_database()
+
+    @property
+    def collection(self) -> "AsyncIOMotorCollection":  # type: ignore
+        return self.database.get_collection("products")
+
+    async def _enable_pre_images(self) -> bool:
+        """Keep the deleted document so delete events carry id and price."""
+        options = {"changeStreamPreAndPostImages": {"enabled": True}}
+        try:
+            await self.database.command("collMod", "products", **options)
+        except OperationFailure as exc:
+            if exc.code != NAMESPACE_NOT_FOUND:
+                # Servidor anterior ao 6.0
+                return False
+            try:
+                await self.database.create_collection("products", **options)
+            except OperationFailure:
+                return False
+        return True
+
+    def _watch(self, pre_images: bool, **kwargs: Any):
+        if pre_images:
+            kwargs["full_document_before_change"] = "whenAvailable"
+        return self.collection.watch(full_document="updateLookup", **kwargs)
+
+    def to_event(self, change: Dict[str, Any]) -> Optional[ProductEventOut]:
+        operation = change["operationType"]
+        if operation == "insert":
+            change_type, document = "create", change.get("fullDocument")
+        elif operation in ("update", "replace"):
+            change_type, document = "update", change.get("fullDocument")
+        elif operation == "delete":
+            change_type, document = "delete", change.get("fullDocumentBeforeChange")
+        else:
+            return None
+
+        if document is None:
+            # Sem pre-image o delete só tem o _id do Mongo; sem pre-images
+            # habilitadas, ProductUsecase.delete publica o evento completo.
+            if change_type == "delete" and ProductChangesUsecase.pre_images:
+                return ProductEventOut(type="delete")
+            return None
+
+        product = ProductOut(**document)
+        return ProductEventOut(type=change_type, id=product.id, product=product)
+
+    async def watch(self, started: Optional[asyncio.Event] = None) -> None:
+        """Publish Mongo change stream events to ``product_events``.
+
+        Returns immediately when the server does not support change
+        streams, leaving ProductUsecase to publish its own writes.
+        ``started`` is set once the stream is open or that is known.
+        """
+        started = started or asyncio.Event()
+        resume_token = None
+
+        try:
+            pre_images = await self._enable_pre_images()
+            ProductChangesUsecase.pre_images = pre_images
+            # Sem pre-image o change stream não diz qual produto foi removido
+            product_events.local_types = set() if pre_images else {"delete"}
+
+            while True:
+                try:
+                    async with self._watch(
+                        pre_images, resume_after=resume_token
+                    ) as stream:
+                        product_events.external_source = True
+                        started.set()
+                        async for change in stream:
+                            resume_token = change["_id"]
+                            event = self.to_event(change)
+                            if event is not None:
+                                product_events.publish(
+                                    event, event_id=resume_token["_data"]
+                                )
+                except OperationFailure as exc:
+                    if exc.code == CHANGE_STREAM_UNSUPPORTED:
+                        logger.info("Change streams unavailable, using local events")
+                        return
+                    logger.warning("Product change stream failed: %s", exc)
+                except PyMongoError as exc:
+                    logger.warning("Product change stream failed: %s", exc)
+
+                # Continua como fonte durante a retomada: as escritas locais
+                # desse intervalo chegam pelo stream a partir do resume_token.
+                await asyncio.sleep(1)
+        finally:
+            product_events.external_source = False
+            product_events.local_types = set()
+            started.set()
+
+    def _matches(
+        self,
+        event: ProductEventOut,
+        ids: Optional[List[UUID]],
+        min_price: Optional[Decimal],
+        max_price: Optional[Decimal],
+    ) -> bool:
+        if ids and event.id not in ids:
+            return False
+
+        if min_price is None and max_price is None:
+            return True
+
+        if event.product is None:
+            return False
+
+        price = event.product.price
+        if min_price is not None and price < min_price:
+            return False
+        if max_price is not None and price > max_price:
+            return False
+
+        return True
+
+    def _catch_up_slots(self) -> asyncio.Semaphore:
+        if ProductChangesUsecase.catch_up_slots is None:
+            ProductChangesUsecase.catch_up_slots = asyncio.Semaphore(
+                get_settings().SSE_MAX_CATCH_UPS
+            )
+        return ProductChangesUsecase.catch_up_slots
+
+    async def _catch_up(
+        self,
+        last_event_id: str,
+        subscription: Subscription,
+        pending: List[Optional[Entry]],
+        delivered: Deque[str],
+    ) -> AsyncIterator[Change]:
+        """Replay the oplog after ``last_event_id`` until the bus has caught up.
+
+        Bus entries received meanwhile are moved to ``pending``. Stops at
+        the first change already in ``pending``, or when the oplog has
+        nothing newer, so the caller continues from the shared bus.
+        """
+        pending_ids: Set[str] = set()
+        async with self._watch(
+            ProductChangesUsecase.pre_images,
+            resume_after={"_data": last_event_id},
+            max_await_time_ms=CATCH_UP_AWAIT_MS,
+        ) as stream:
+            while stream.alive and not product_events.closed:
+                change = await stream.try_next()
+                while not subscription.queue.empty():
+                    entry = subscription.queue.get_nowait()
+                    pending.append(entry)
+                    if entry is None:
+                        return
+                    pending_ids.add(entry[1])
+
+                if change is None:
+                    return
+
+                event_id = change["_id"]["_data"]
+                if event_id in pending_ids:
+                    return
+
+                delivered.append(event_id)
+                event = self.to_event(change)
+                if event is not None:
+                    yield event_id, event
+
+    async def stream(
+        self,
+        last_event_id: Optional[str] = None,
+        ids: Optional[List[UUID]] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[Optional[Change]]:
+        """Yield matching changes, or ``None`` every ``heartbeat`` idle seconds.
+
+        An id older than the in-memory history is replayed from the oplog
+        (at most SSE_MAX_CATCH_UPS at a time per worker) and, when that is
+        not possible, answered with a ``resync`` event. Ends when the
+        subscriber falls too far behind or the server shuts down; clients
+        reconnect with the last id they received.
+        """
+        entries = product_events.since(last_event_id) if last_event_id else []
+
+        with product_events.subscribe() as subscription:
+            # Ids já enviados pelo oplog, para não repetir os do barramento
+            delivered: Deque[str] = deque(maxlen=subscription.maxsize)
+
+            if last_event_id and entries is None:
+                pending: List[Optional[Entry]] = []
+                if product_events.external_source:
+                    try:
+                        async with self._catch_up_slots():
+                            async for change in self._catch_up(
+                                last_event_id, subscription, pending, delivered
+                            ):
+                                if self._matches(change[1], ids, min_price, max_price):
+                                    yield change
+                    except OperationFailure as exc:
+                        logger.info("Cannot resume change stream: %s", exc)
+                        yield RESYNC
+                else:
+                    yield RESYNC
+                entries = pending
+
+            last_sequence = 0
+            for entry in entries or []:
+                if entry is None:
+                    return
+                sequence, event_id, event = entry
+                last_sequence = sequence
+                if event_id in delivered:
+                    continue
+                if self._matches(event, ids, min_price, max_price):
+                    yield event_id, event
+
+            while True:
+                try:
+                    entry = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if entry is None:
+                    return
+
+                sequence, event_id, event = entry
+                if sequence <= last_sequence or event_id in delivered:
+                    continue
+                if self._matches(event, ids, min_price, max_price):
+                    yield event_id, event
@@ -0,0 +1,116 @@
+import io
+import json
+
+from store.cli import Progress, export_products, import_products
+from store.usecases.product import product_usecase
+from tests.factories import products_data
+
+
+def products_csv(products):
+    lines = ["name,quantity,price,status"]
+    lines += [
+        f"{p['name']},{p['quantity']},{p['price']},{str(p['status']).lower()}"
+        for p in products
+    ]
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+async def test_cli_import_csv_should_insert_products():
+    progress = Progress(stream=io.StringIO())
+
+    await import_products(
+        file=products_csv(products_data()),
+        format="csv",
+        progress=progress,
+        batch_size=3,
+        concurrency=2,
+    )
+
+    result = await product_usecase.query()
+    assert progress.rows == 8
+    assert progress.errors == 0
+    assert len(result) == 8
+
+
+async def test_cli_import_should_report_row_errors():
+    errors = io.StringIO()
+    products = products_data()[:2] + [{"name": "Iphone 7", "quantity": 1}]
+    file = io.StringIO("\n".join(json.dumps(p) for p in products) + "\n")
+
+    await import_products(
+        file=file, format="ndjson", progress=Progress(stream=errors), batch_size=2
+    )
+
+    reported = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert [error["row"] for error in reported] == [3]
+    assert len(await product_usecase.query()) == 2
+
+
+async def test_cli_import_should_report_malformed_json_lines():
+    errors = io.StringIO()
+    lines = [
+        json.dumps(products_data()[0]),
+        "{not json",
+        json.dumps(products_data()[1]),
+    ]
+
+    await import_products(
+        file=io.StringIO("\n".join(lines) + "\n"),
+        format="ndjson",
+        progress=Progress(stream=errors),
+    )
+
+    reported = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert [error["row"] for error in reported] == [2]
+    assert len(await product_usecase.query()) == 2
+
+
+async def test_cli_import_same_name_in_concurrent_batches_should_insert_once():
+    errors = io.StringIO()
+    products = products_data()[:3] * 2
+
+    await import_products(
+        file=products_csv(products),
+        format="csv",
+        progress=Progress(stream=errors),
+        batch_size=3,
+        concurrency=2,
+    )
+
+    reported = [json.loads(line) for line in errors.getvalue().splitlines()]
+    assert len(reported) == 3
+    assert len(await product_usecase.query()) == 3
+
+
+async def test_cli_import_duplicated_name_should_fail_unless_upsert():
+    await import_products(
+        file=products_csv(products_data()[:1]),
+        format="csv",
+        progress=Progress(stream=io.StringIO()),
+    )
+    updated = [{**products_data()[0], "quantity": 99}]
+
+    progress = Progress(stream=io.StringIO())
+    await import_products(file=products_csv(updated), format="csv", progress=progress)
+    assert progress.errors == 1
+
+    progress = Progress(stream=io.StringIO())
+    await import_products(
+        file=products_csv(updated), format="csv", progress=progress, upsert=True
+    )
+    result = await product_usecase.query()
+    assert progress.errors == 0
+    assert [product.quantity for product in result] == [99]
+
+
+async def test_cli_export_ndjson_should_write_every_product(products_inserted):
+    file = io.StringIO()
+
+    await export_products(
+        file=file, format="ndjson", progress=Progress(stream=io.StringIO())
+    )
+
+    exported = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert {product["id"] for product in exported} == {
+        str(product.id) for product in products_inserted
+    }
@@ -4,7 +4,7 @@ import asyncio
 from uuid import UUID
 from store.db.mongo import db_client
 from store.schemas.product import ProductIn, ProductUpdate
-from store.usecases.product import product_usecase
+from store.usecases.product import count_cache, product_usecase
 from tests.factories import product_data, products_data
 import httpx
 
@@ -31,11 +31,18 @@ async def clear_collections(mongo_client):
 
         await mongo_client.get_database()[collection_name].delete_many({})
 
+    count_cache.clear()
+
 
 @pytest.fixture
-async def client() -> "httpx.AsyncClient":  # type: ignore
-    from store.main import app
+def app():
+    from store.main import create_app
+
+    return create_app()
 
+
+@pytest.fixture
+async def client(app) -> "httpx.AsyncClient":  # type: ignore
     async with httpx.AsyncClient(app=app, base_url="http://test") as ac:
         yield ac  # pyright: ignore[reportReturnType]
 
@@ -0,0 +1,26 @@
+from fastapi import status
+
+from store.core.warmup import warm_up
+
+
+async def test_controller_live_should_return_success(client):
+    response = await client.get("/health/live")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok"}
+
+
+async def test_controller_ready_before_warm_up_should_return_unavailable(client):
+    response = await client.get("/health/ready")
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {"status": "warming up"}
+
+
+async def test_controller_ready_after_warm_up_should_return_success(app, client):
+    await warm_up(app)
+
+    response = await client.get("/health/ready")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ready"}
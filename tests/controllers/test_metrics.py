@@ -0,0 +1,40 @@
+import pytest
+from fastapi import status
+from pymongo.errors import PyMongoError
+from store.db.mongo import db_client
+
+
+async def has_secondaries() -> bool:
+    try:
+        hello = await db_client.get().admin.command("hello")
+    except (PyMongoError, NotImplementedError):
+        return False
+    return "setName" in hello and len(hello.get("hosts", [])) > 1
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_mongo_metrics_should_count_reads_by_server_type(
+    client, products_url
+):
+    await client.get(products_url)
+
+    response = await client.get("/metrics/mongo")
+    reads = response.json()["reads"]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert sum(commands.get("find", 0) for commands in reads.values()) > 0
+    assert set(reads) <= {"Standalone", "RSPrimary", "RSSecondary", "Mongos"}
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_mongo_metrics_should_count_query_reads_on_secondaries(
+    client, products_url
+):
+    if not await has_secondaries():
+        pytest.skip("Needs a replica set with a secondary")
+
+    before = (await client.get("/metrics/mongo")).json()["reads"]
+    await client.get(products_url)
+    after = (await client.get("/metrics/mongo")).json()["reads"]
+
+    assert after["RSSecondary"]["find"] > before.get("RSSecondary", {}).get("find", 0)
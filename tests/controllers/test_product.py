@@ -1,3 +1,5 @@
+import asyncio
+import json
 from decimal import Decimal
 from random import randint
 from typing import List
@@ -5,7 +7,8 @@ from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from httpx import AsyncClient
 import pytest
-from tests.factories import product_data
+from store.usecases.product import product_events
+from tests.factories import product_data, products_data
 from fastapi import status
 
 
@@ -39,6 +42,51 @@ async def test_controller_create_should_return_fail(
     )
 
 
+async def test_controller_create_with_idempotency_key_should_replay_response(
+    client, products_url
+):
+    headers = {"Idempotency-Key": "c1b6f2d2-create"}
+
+    first = await client.post(products_url, json=product_data(), headers=headers)
+    retry = await client.post(products_url, json=product_data(), headers=headers)
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert retry.status_code == status.HTTP_201_CREATED
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotency-Replayed"] == "true"
+
+
+async def test_controller_create_with_concurrent_idempotency_key_should_create_once(
+    client, products_url
+):
+    headers = {"Idempotency-Key": "c1b6f2d2-concurrent"}
+
+    responses = await asyncio.gather(
+        *[
+            client.post(products_url, json=product_data(), headers=headers)
+            for _ in range(3)
+        ]
+    )
+
+    assert {response.status_code for response in responses} == {status.HTTP_201_CREATED}
+    assert len({response.json()["id"] for response in responses}) == 1
+
+
+async def test_controller_create_with_reused_idempotency_key_should_return_fail(
+    client, products_url
+):
+    headers = {"Idempotency-Key": "c1b6f2d2-reused"}
+    other_product = {**product_data(), "name": "Iphone 16"}
+
+    await client.post(products_url, json=product_data(), headers=headers)
+    response = await client.post(products_url, json=other_product, headers=headers)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json() == {
+        "detail": "Idempotency-Key was already used with a different request"
+    }
+
+
 async def test_controller_get_should_return_success(
     client, products_url, product_inserted
 ):
@@ -77,6 +125,118 @@ async def test_controller_query_should_return_success(client, products_url):
     assert len(response.json()) > 1
 
 
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_query_with_total_should_return_count_header(
+    client, products_url
+):
+    response = await client.get(products_url, params={"total": True})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Total-Count"] == "8"
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_query_with_exact_total_and_filter(client, products_url):
+    response = await client.get(
+        products_url,
+        params={"min_price": "7.000", "total": True, "exact": True},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Total-Count"] == str(len(response.json()))
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_query_with_msgpack_should_return_success(
+    client, products_url
+):
+    msgpack = pytest.importorskip("msgpack")
+
+    response = await client.get(products_url, headers={"Accept": "application/msgpack"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == (await client.get(products_url)).json()
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_query_with_columnar_json_should_return_success(
+    client, products_url
+):
+    response = await client.get(
+        products_url,
+        params={"total": True},
+        headers={"Accept": "application/vnd.store.columnar+json"},
+    )
+    content = response.json()
+    name = content["fields"].index("name")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Total-Count"] == "8"
+    assert "Accept" in response.headers["Vary"]
+    assert len(content["rows"]) == 8
+    assert {row[name] for row in content["rows"]} == {
+        product["name"] for product in products_data()
+    }
+
+
+async def test_controller_query_should_prefer_most_specific_accept_range(
+    client, products_url
+):
+    response = await client.get(
+        products_url,
+        headers={
+            "Accept": "*/*;q=0.9, application/json;q=0.1, application/msgpack;q=0"
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/vnd.store.columnar+json"
+    assert "Accept" in response.headers["Vary"]
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_query_should_compress_large_responses(client, products_url):
+    response = await client.get(products_url, headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 8
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_query_should_not_use_refused_encoding(client, products_url):
+    response = await client.get(
+        products_url, headers={"Accept-Encoding": "br;q=0, gzip;q=0"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "content-encoding" not in response.headers
+
+
+async def test_controller_get_should_not_compress_small_responses(
+    client, products_url, product_inserted
+):
+    response = await client.get(
+        f"{products_url}{product_inserted.id}", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_controller_export_should_stream_ndjson(client, products_url):
+    response = await client.get(f"{products_url}export")
+    lines = response.text.splitlines()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "Accept" in response.headers["Vary"]
+    assert len(lines) == 8
+    assert json.loads(lines[0])["name"] == products_data()[0]["name"]
+
+
 async def test_controller_patch_should_return_success(
     client, products_url, product_inserted
 ):
@@ -328,3 +488,74 @@ async def test_price_filter_with_status_true(client: AsyncClient, products_url:
     products = response.json()
     assert len(products) == 4
     assert all(product["status"] for product in products)
+
+
+@pytest.fixture
+def closed_events():
+    # Com o barramento fechado o stream termina depois do replay
+    product_events.close()
+    yield
+    product_events.closed = False
+
+
+def event_id_of(product_id: UUID) -> str:
+    return next(
+        event_id
+        for _, event_id, event in product_events.history
+        if event.id == product_id
+    )
+
+
+def parse_events(body: str) -> List[dict]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({**fields, "data": json.loads(fields["data"])})
+    return events
+
+
+async def test_controller_changes_should_replay_after_last_event_id(
+    client, products_url, products_inserted, closed_events
+):
+    response = await client.get(
+        f"{products_url}changes",
+        headers={"Last-Event-ID": event_id_of(products_inserted[0].id)},
+    )
+    events = parse_events(response.text)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert [event["data"]["product"]["name"] for event in events] == [
+        product.name for product in products_inserted[1:]
+    ]
+    assert events[0]["id"] == event_id_of(products_inserted[1].id)
+    assert {event["event"] for event in events} == {"create"}
+
+
+async def test_controller_changes_should_filter_by_ids(
+    client, products_url, products_inserted, closed_events
+):
+    selected = products_inserted[2]
+
+    response = await client.get(
+        f"{products_url}changes",
+        params={"ids": str(selected.id)},
+        headers={"Last-Event-ID": event_id_of(products_inserted[0].id)},
+    )
+    events = parse_events(response.text)
+
+    assert [event["data"]["id"] for event in events] == [str(selected.id)]
+
+
+async def test_controller_changes_should_ask_for_resync_on_unknown_id(
+    client, products_url, closed_events
+):
+    response = await client.get(
+        f"{products_url}changes", headers={"Last-Event-ID": "expired"}
+    )
+    events = parse_events(response.text)
+
+    assert events == [
+        {"event": "resync", "data": {"type": "resync", "id": None, "product": None}}
+    ]
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from store.core.middlewares import CompressionMiddleware
+
+
+def http_scope(accept_encoding: str) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip;q=0", None),
+        ("br;q=0, gzip", "gzip"),
+        ("*;q=0", None),
+        ("identity;q=1, gzip;q=0.5", None),
+        ("deflate", None),
+    ],
+)
+def test_compression_should_honour_accept_encoding_quality(accept_encoding, expected):
+    middleware = CompressionMiddleware(app=None)  # type: ignore
+
+    assert middleware.select_encoding(http_scope(accept_encoding)) == expected
+
+
+async def test_compression_should_send_event_stream_headers_immediately():
+    first_event = asyncio.Event()
+    sent = []
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        await first_event.wait()
+        await send({"type": "http.response.body", "body": b": keep-alive\n\n"})
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = CompressionMiddleware(app=app)
+    response = asyncio.ensure_future(middleware(http_scope("gzip"), None, send))
+    await asyncio.sleep(0.01)
+
+    assert [message["type"] for message in sent] == ["http.response.start"]
+
+    first_event.set()
+    await response
+    assert sent[1]["body"] == b": keep-alive\n\n"
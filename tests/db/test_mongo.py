@@ -0,0 +1,39 @@
+import os
+
+from store.db.mongo import MongoClient
+
+
+def test_mongo_client_should_be_reused_in_same_process():
+    mongo = MongoClient()
+
+    assert mongo.get() is mongo.get()
+
+    mongo.close()
+
+
+def test_mongo_client_should_be_recreated_after_fork(monkeypatch):
+    mongo = MongoClient()
+    parent = mongo.get()
+    parent_pid = mongo.pid
+
+    monkeypatch.setattr(os, "getpid", lambda: parent_pid + 1)
+    child = mongo.get()
+
+    assert child is not parent
+    assert mongo.pid == parent_pid + 1
+
+    mongo.close()
+    monkeypatch.undo()
+    parent.close()
+
+
+def test_mongo_client_close_should_reset_client():
+    mongo = MongoClient()
+    client = mongo.get()
+
+    mongo.close()
+
+    assert mongo.client is None
+    assert mongo.get() is not client
+
+    mongo.close()
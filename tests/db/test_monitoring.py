@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from store.db.monitoring import ReadMetrics
+
+
+def test_read_metrics_should_not_lose_counts_across_threads():
+    metrics = ReadMetrics()
+    address = ("localhost", 27017)
+    metrics.description_changed(
+        SimpleNamespace(
+            server_address=address,
+            new_description=SimpleNamespace(server_type_name="RSSecondary"),
+        )
+    )
+    event = SimpleNamespace(command_name="find", connection_id=address)
+
+    def read(_):
+        for _ in range(1000):
+            metrics.succeeded(event)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(read, range(8)))
+
+    assert metrics.snapshot() == {"RSSecondary": {"find": 8000}}
@@ -0,0 +1,86 @@
+import pytest
+from pydantic import ValidationError
+from store.core.config import READ_PREFERENCE_MODES, Settings, get_settings
+from store.db.routing import READ_PREFERENCES, routing_policy
+from store.usecases.product import product_usecase
+
+
+def test_routing_browse_operations_should_read_from_secondaries():
+    collection = product_usecase.routed("query")
+
+    assert collection.read_preference.mongos_mode == "secondaryPreferred"
+    assert collection.read_preference.max_staleness == 90
+    assert collection.read_concern.level == "local"
+
+
+def test_routing_stock_writes_should_require_majority():
+    collection = product_usecase.routed("update")
+
+    assert collection.read_preference.mongos_mode == "primary"
+    assert collection.write_concern.document == {"w": "majority", "j": True}
+
+
+def test_routing_bulk_writes_should_use_w1():
+    collection = product_usecase.routed("bulk_create")
+
+    assert collection.write_concern.document == {"w": 1}
+
+
+def test_routing_profile_override_should_apply_to_every_operation():
+    with routing_policy.use_profile("primary"):
+        collection = product_usecase.routed("query")
+
+    assert collection.read_preference.mongos_mode == "primary"
+    assert product_usecase.routed("query").read_preference.mongos_mode == (
+        "secondaryPreferred"
+    )
+
+
+async def test_routing_route_profiles_should_override_operation_profiles(
+    monkeypatch, client, products_url, product_inserted
+):
+    monkeypatch.setattr(
+        get_settings(), "MONGO_ROUTE_PROFILES", {"GET /products/{id}": "primary"}
+    )
+    seen = []
+    routed = product_usecase.routed
+
+    def spy(operation):
+        collection = routed(operation)
+        seen.append(collection.read_preference.mongos_mode)
+        return collection
+
+    monkeypatch.setattr(
+        "store.usecases.product.ProductUsecase.routed",
+        lambda self, operation: spy(operation),
+    )
+
+    response = await client.get(f"{products_url}{product_inserted.id}")
+
+    assert response.status_code == 200
+    assert seen == ["primary"]
+
+
+def test_routing_read_preferences_should_cover_every_configurable_mode():
+    assert set(READ_PREFERENCES) == set(READ_PREFERENCE_MODES)
+
+
+@pytest.mark.parametrize(
+    "settings, typo",
+    [
+        ({"MONGO_OPERATION_PROFILES": {"query": "browze"}}, "browze"),
+        ({"MONGO_ROUTE_PROFILES": {"GET /products/{id}": "primay"}}, "primay"),
+        (
+            {
+                "MONGO_PROFILES": {
+                    **Settings.model_fields["MONGO_PROFILES"].default,
+                    "browse": {"read_preference": "secondaryPrefered"},
+                }
+            },
+            "secondaryPrefered",
+        ),
+    ],
+)
+def test_routing_settings_should_reject_unknown_names(settings, typo):
+    with pytest.raises(ValidationError, match=typo):
+        Settings(**settings)  # type: ignore
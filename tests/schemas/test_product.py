@@ -1,7 +1,9 @@
+from decimal import Decimal
 from pydantic import ValidationError
 
 import pytest
-from store.schemas.product import ProductIn
+from store.core.config import get_settings
+from store.schemas.product import ProductIn, ProductOut, ProductUpdate
 from tests.factories import product_data
 
 
@@ -25,3 +27,30 @@ def test_schemas_return_raise():
         "input": {"name": "Iphone 14 Pro Max", "quantity": 10, "price": 8.5},
         "url": "https://errors.pydantic.dev/2.5/v/missing",
     }
+
+
+def test_schemas_out_should_read_minor_unit_price():
+    data = {
+        **product_data(),
+        "id": "fce6cc37-10b9-4a8e-a8b2-977df327001a",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-01-01T00:00:00+00:00",
+        "price": 8500,
+        "price_scale": 3,
+    }
+
+    product = ProductOut.model_validate(data)
+
+    assert product.price == Decimal("8.500")
+    assert str(product.price) == "8.500"
+
+
+@pytest.mark.parametrize("schema", [ProductIn, ProductUpdate])
+def test_schemas_with_minor_units_should_reject_price_beyond_scale(monkeypatch, schema):
+    monkeypatch.setattr(get_settings(), "PRICE_STORAGE", "minor_units")
+    data = {**product_data(), "price": "8.5005"}
+
+    with pytest.raises(ValidationError) as err:
+        schema.model_validate(data)
+
+    assert err.value.errors()[0]["loc"] == ("price",)
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from store.core.config import get_settings
+from store.core.exceptions import IdempotencyConflictException
+from store.usecases import idempotency
+from store.usecases.idempotency import IdempotencyUsecase
+
+
+async def test_usecases_claim_should_take_over_expired_pending_claim():
+    crashed = IdempotencyUsecase()
+    await crashed.claim(key="POST /products/ key", fingerprint="body")
+    await crashed.collection.update_one(
+        {"_id": "POST /products/ key"},
+        {"$set": {"locked_until": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+    )
+
+    retry = IdempotencyUsecase()
+    result = await retry.claim(key="POST /products/ key", fingerprint="body")
+    await crashed.release(key="POST /products/ key")
+    stored = await retry.collection.find_one({"_id": "POST /products/ key"})
+
+    assert result is None
+    assert stored["owner"] == retry.owner
+
+
+async def test_usecases_claim_should_not_leak_waiters_on_timeout(monkeypatch):
+    monkeypatch.setattr(get_settings(), "IDEMPOTENCY_WAIT_TIMEOUT", 0.05)
+    await IdempotencyUsecase().claim(key="POST /products/ busy", fingerprint="body")
+
+    with pytest.raises(IdempotencyConflictException):
+        await IdempotencyUsecase().claim(key="POST /products/ busy", fingerprint="body")
+
+    assert "POST /products/ busy" not in idempotency._waiters
@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+import pytest
+from bson import Decimal128
+from store.core.config import get_settings
+from store.core.exceptions import PriceStorageException
+from store.usecases.price_migration import PriceMigrationUsecase
+from store.usecases.product import product_usecase
+from tests.factories import products_data
+
+
+@pytest.fixture
+def minor_units(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PRICE_STORAGE", "minor_units")
+    monkeypatch.setattr(settings, "PRICE_DUAL_READ", True)
+
+
+async def test_usecases_create_with_minor_units_should_store_integer_price(
+    minor_units, product_in
+):
+    result = await product_usecase.create(body=product_in)
+    stored = await product_usecase.collection.find_one({"id": result.id})
+
+    assert stored["price"] == 8500
+    assert stored["price_scale"] == 3
+    assert (await product_usecase.get(id=result.id)).price == Decimal("8.500")
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_usecases_price_migration_should_convert_every_product(minor_units):
+    migrated = await PriceMigrationUsecase().run(batch_size=3)
+
+    stored = await product_usecase.collection.find({}).to_list(length=None)
+    result = await product_usecase.query()
+
+    assert migrated == 8
+    assert all(isinstance(item["price"], int) for item in stored)
+    assert sorted(str(product.price) for product in result) == sorted(
+        product["price"] for product in products_data()
+    )
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_usecases_price_migration_should_resume_from_checkpoint(minor_units):
+    def interrupt(rows):
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        await PriceMigrationUsecase().run(batch_size=3, on_batch=interrupt)
+
+    migrated = await PriceMigrationUsecase().run(batch_size=3)
+
+    assert migrated == 5
+    assert await product_usecase.collection.count_documents({"price_scale": 3}) == 8
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_usecases_price_migration_should_refuse_decimal128_storage():
+    with pytest.raises(PriceStorageException):
+        await PriceMigrationUsecase().run()
+
+    assert await product_usecase.collection.count_documents({"price_scale": 3}) == 0
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_usecases_price_migration_should_skip_prices_that_do_not_fit_scale(
+    minor_units,
+):
+    await product_usecase.collection.update_one(
+        {"name": "Iphone 7"}, {"$set": {"price": Decimal128("4.5005")}}
+    )
+
+    migrated = await PriceMigrationUsecase().run()
+    stored = await product_usecase.collection.find_one({"name": "Iphone 7"})
+
+    assert migrated == 7
+    assert stored["price"] == Decimal128("4.5005")
+    assert "price_scale" not in stored
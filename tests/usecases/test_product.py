@@ -1,3 +1,4 @@
+from decimal import Decimal
 from typing import List
 from uuid import UUID
 
@@ -39,6 +40,25 @@ async def test_usecases_query_should_return_success():
     assert len(result) > 1
 
 
+@pytest.mark.usefixtures("products_inserted")
+async def test_usecases_count_should_return_total():
+    result = await product_usecase.count(exact=True)
+
+    assert result == 8
+
+
+@pytest.mark.usefixtures("products_inserted")
+async def test_usecases_count_with_filter_should_be_invalidated_on_create(
+    product_in,
+):
+    assert await product_usecase.count(min_price=Decimal("8.000")) == 2
+
+    product_in.price = Decimal("9.000")
+    await product_usecase.create(body=product_in)
+
+    assert await product_usecase.count(min_price=Decimal("8.000")) == 3
+
+
 async def test_usecases_update_should_return_success(product_up, product_inserted):
     product_up.price = "7.500"
     result = await product_usecase.update(id=product_inserted.id, body=product_up)
@@ -73,3 +93,13 @@ async def test_usecases_delete_should_not_found():
 #     assert (
 #         response.json()["detail"] == f"Produto com ID {product_inserted.id} já existe"
 #     )
+
+
+async def test_usecases_bulk_create_should_reject_existing_names(products_in):
+    await product_usecase.ensure_indexes()
+    await product_usecase.bulk_create(bodies=products_in[:2])
+
+    errors = await product_usecase.bulk_create(bodies=products_in[1:3])
+
+    assert errors == {0: f"Produto de nome '{products_in[1].name}' já existe."}
+    assert len(await product_usecase.query()) == 3
@@ -0,0 +1,335 @@
+import asyncio
+from contextlib import suppress
+from decimal import Decimal
+
+import pytest
+from pymongo.errors import OperationFailure, PyMongoError
+from store.db.mongo import db_client
+from store.models.product import ProductModel
+from store.schemas.product import ProductEventOut, ProductOut, ProductUpdate
+from store.usecases.product import product_events, product_usecase
+from store.usecases.product_changes import (
+    CHANGE_STREAM_UNSUPPORTED,
+    ProductChangesUsecase,
+)
+
+
+async def next_change(changes):
+    return await asyncio.wait_for(changes.__anext__(), timeout=1)
+
+
+async def is_replica_set() -> bool:
+    try:
+        hello = await db_client.get().admin.command("hello")
+    except (PyMongoError, NotImplementedError):
+        return False
+    return "setName" in hello
+
+
+class FakeChangeStream:
+    """Oplog that runs ``on_next`` before each read, like a slow getMore."""
+
+    def __init__(self, changes, on_next=None):
+        self.changes = list(changes)
+        self.on_next = on_next
+        self.alive = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        if self.on_next:
+            self.on_next(len(self.changes))
+        return self.changes.pop(0) if self.changes else None
+
+
+@pytest.fixture
+def stored_product(product_in):
+    return ProductModel(**product_in.model_dump()).model_dump()
+
+
+@pytest.fixture
+def external_source():
+    product_events.external_source = True
+    yield
+    product_events.external_source = False
+    product_events.local_types = set()
+
+
+def oplog_change(event_id, document):
+    return {
+        "_id": {"_data": event_id},
+        "operationType": "insert",
+        "fullDocument": document,
+    }
+
+
+@pytest.mark.parametrize(
+    "operation, change_type",
+    [("insert", "create"), ("update", "update"), ("replace", "update")],
+)
+def test_usecases_to_event_should_use_full_document(
+    stored_product, operation, change_type
+):
+    event = ProductChangesUsecase().to_event(
+        {"operationType": operation, "fullDocument": stored_product}
+    )
+
+    assert event.type == change_type
+    assert event.id == stored_product["id"]
+    assert event.product.price == Decimal("8.500")
+
+
+def test_usecases_to_event_delete_should_use_pre_image(stored_product):
+    event = ProductChangesUsecase().to_event(
+        {"operationType": "delete", "fullDocumentBeforeChange": stored_product}
+    )
+
+    assert event.type == "delete"
+    assert event.id == stored_product["id"]
+    assert event.product.name == stored_product["name"]
+
+
+def test_usecases_to_event_delete_without_pre_image_should_have_no_product(
+    monkeypatch,
+):
+    monkeypatch.setattr(ProductChangesUsecase, "pre_images", True)
+    event = ProductChangesUsecase().to_event({"operationType": "delete"})
+
+    assert event.type == "delete"
+    assert event.id is None
+    assert event.product is None
+
+
+def test_usecases_to_event_should_leave_deletes_to_usecase_without_pre_images():
+    # ProductUsecase.delete publica o delete com o documento
+    assert ProductChangesUsecase().to_event({"operationType": "delete"}) is None
+
+
+@pytest.mark.parametrize(
+    "change", [{"operationType": "update"}, {"operationType": "invalidate"}]
+)
+def test_usecases_to_event_should_ignore_changes_without_product(change):
+    assert ProductChangesUsecase().to_event(change) is None
+
+
+async def test_usecases_changes_should_stream_create_update_and_delete(product_in):
+    changes = ProductChangesUsecase().stream()
+    pending = asyncio.ensure_future(next_change(changes))
+    await asyncio.sleep(0.01)
+
+    product = await product_usecase.create(body=product_in)
+    _, created = await pending
+    await product_usecase.update(id=product.id, body=ProductUpdate(quantity=5))
+    _, updated = await next_change(changes)
+    await product_usecase.delete(id=product.id)
+    _, deleted = await next_change(changes)
+
+    assert [created.type, updated.type, deleted.type] == ["create", "update", "delete"]
+    assert {created.id, updated.id, deleted.id} == {product.id}
+    assert updated.product.quantity == 5
+
+    await changes.aclose()
+
+
+async def test_usecases_changes_should_filter_by_price(products_in):
+    changes = ProductChangesUsecase().stream(
+        min_price=Decimal("7.000"), max_price=Decimal("8.000")
+    )
+    pending = asyncio.ensure_future(next_change(changes))
+    await asyncio.sleep(0.01)
+
+    for product_in in products_in:
+        await product_usecase.create(body=product_in)
+
+    _, first = await pending
+    _, second = await next_change(changes)
+
+    assert first.product.name == "Iphone 10 Pro Max"
+    assert second.product.name == "Iphone 13 Pro Max"
+
+    await changes.aclose()
+
+
+async def test_usecases_changes_should_resume_after_last_event_id(products_in):
+    changes = ProductChangesUsecase().stream()
+    pending = asyncio.ensure_future(next_change(changes))
+    await asyncio.sleep(0.01)
+
+    for product_in in products_in[:3]:
+        await product_usecase.create(body=product_in)
+    last_event_id, _ = await pending
+    await changes.aclose()
+
+    resumed = ProductChangesUsecase().stream(last_event_id=last_event_id)
+    _, second = await next_change(resumed)
+    _, third = await next_change(resumed)
+
+    assert [second.product.name, third.product.name] == [
+        products_in[1].name,
+        products_in[2].name,
+    ]
+
+    await resumed.aclose()
+
+
+async def test_usecases_changes_should_end_when_events_close():
+    changes = ProductChangesUsecase().stream(heartbeat=60)
+    pending = asyncio.ensure_future(next_change(changes))
+    await asyncio.sleep(0.01)
+
+    product_events.close()
+    try:
+        with pytest.raises(StopAsyncIteration):
+            await pending
+    finally:
+        product_events.closed = False
+
+
+async def test_usecases_watch_should_publish_writes_from_other_clients(
+    stored_product,
+):
+    if not await is_replica_set():
+        pytest.skip("Change streams need a replica set")
+
+    watcher = asyncio.create_task(ProductChangesUsecase().watch())
+    try:
+        for _ in range(100):
+            if product_events.external_source:
+                break
+            await asyncio.sleep(0.05)
+
+        with product_events.subscribe() as subscription:
+            await product_usecase.collection.insert_one(stored_product)
+            _, _, event = await asyncio.wait_for(subscription.queue.get(), 5)
+    finally:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+
+    assert event.type == "create"
+    assert event.id == stored_product["id"]
+    assert not product_events.external_source
+
+
+async def test_usecases_changes_should_switch_from_oplog_to_bus(
+    monkeypatch, external_source, products_in
+):
+    documents = [
+        ProductModel(**product_in.model_dump()).model_dump()
+        for product_in in products_in[:3]
+    ]
+    bus_event = ProductEventOut(
+        type="create", id=documents[2]["id"], product=ProductOut(**documents[2])
+    )
+
+    def on_next(remaining):
+        # O watcher alcança o terceiro evento enquanto o cliente recupera
+        if remaining == 2:
+            product_events.publish(bus_event, event_id="c")
+
+    oplog = FakeChangeStream(
+        [
+            oplog_change(event_id, document)
+            for event_id, document in zip("abc", documents)
+        ],
+        on_next=on_next,
+    )
+    monkeypatch.setattr(ProductChangesUsecase, "_watch", lambda *_, **__: oplog)
+
+    changes = ProductChangesUsecase().stream(last_event_id="unknown", heartbeat=60)
+    received = [await next_change(changes) for _ in range(3)]
+    await changes.aclose()
+
+    assert [event_id for event_id, _ in received] == ["a", "b", "c"]
+    # O oplog parou no primeiro evento já entregue pelo barramento
+    assert oplog.changes == []
+    assert received[2][1] is bus_event
+
+
+async def test_usecases_changes_should_limit_concurrent_catch_ups(
+    monkeypatch, external_source
+):
+    monkeypatch.setattr(ProductChangesUsecase, "catch_up_slots", asyncio.Semaphore(1))
+    monkeypatch.setattr(
+        ProductChangesUsecase, "_watch", lambda *_, **__: FakeChangeStream([])
+    )
+    await ProductChangesUsecase.catch_up_slots.acquire()
+
+    changes = ProductChangesUsecase().stream(last_event_id="unknown", heartbeat=0.05)
+    pending = asyncio.ensure_future(next_change(changes))
+    await asyncio.sleep(0.1)
+    blocked = not pending.done()
+
+    ProductChangesUsecase.catch_up_slots.release()
+    heartbeat = await pending
+    await changes.aclose()
+
+    assert blocked
+    assert heartbeat is None
+
+
+async def test_usecases_changes_should_ask_for_resync_when_id_is_unknown():
+    changes = ProductChangesUsecase().stream(last_event_id="unknown", heartbeat=60)
+    event_id, event = await next_change(changes)
+    await changes.aclose()
+
+    assert event_id == ""
+    assert event.type == "resync"
+
+
+async def test_usecases_changes_should_ask_for_resync_when_oplog_is_gone(
+    monkeypatch, external_source
+):
+    def expired(*_, **__):
+        raise OperationFailure("resume point may no longer be in the oplog", 286)
+
+    monkeypatch.setattr(ProductChangesUsecase, "_watch", expired)
+
+    changes = ProductChangesUsecase().stream(last_event_id="unknown", heartbeat=60)
+    _, event = await next_change(changes)
+    await changes.aclose()
+
+    assert event.type == "resync"
+
+
+async def test_usecases_delete_should_publish_locally_without_pre_images(
+    external_source, product_inserted
+):
+    product_events.local_types = {"delete"}
+
+    with product_events.subscribe() as subscription:
+        await product_usecase.update(
+            id=product_inserted.id, body=ProductUpdate(quantity=5)
+        )
+        await product_usecase.delete(id=product_inserted.id)
+        _, _, event = subscription.queue.get_nowait()
+
+    assert subscription.queue.empty()
+    assert event.type == "delete"
+    assert event.id == product_inserted.id
+    assert event.product.name == product_inserted.name
+
+
+async def test_usecases_watch_should_signal_start_when_unsupported(monkeypatch):
+    async def enable_pre_images(self):
+        return False
+
+    def unsupported(*_, **__):
+        raise OperationFailure(
+            "The $changeStream stage is only supported on replica sets",
+            CHANGE_STREAM_UNSUPPORTED,
+        )
+
+    monkeypatch.setattr(ProductChangesUsecase, "_enable_pre_images", enable_pre_images)
+    monkeypatch.setattr(ProductChangesUsecase, "_watch", unsupported)
+    started = asyncio.Event()
+
+    await asyncio.wait_for(ProductChangesUsecase().watch(started=started), 1)
+
+    assert started.is_set()
+    assert not product_events.external_source
+    assert product_events.local_types == set()